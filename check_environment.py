@@ -6,96 +6,68 @@ This script checks if the system is Windows and provides guidance
 on how to run the secure connection script properly.
 """
 
-import os
 import sys
-import platform
-import subprocess
-from pathlib import Path
+import functools
+import hashlib
+import shutil
+from dataclasses import dataclass
 
+# Resolved once at import; sys.platform is fixed at interpreter build time
+_IS_WINDOWS = sys.platform.startswith('win')
 
-def check_windows_environment():
-    """Check if running on Windows and provide guidance."""
-    
-    if platform.system() == 'Windows':
-        print("🖥️  Windows Environment Detected")
-        print("="*50)
-        print("This script is designed for Linux systems (Ubuntu/Debian).")
-        print("Here are your options to run it on Windows:\n")
-        
-        print("1. 🐧 WSL (Windows Subsystem for Linux) - RECOMMENDED")
-        print("   • Open PowerShell as Administrator")
-        print("   • Run: wsl --install Ubuntu-22.04")
-        print("   • Restart your computer")
-        print("   • Open Ubuntu from Start Menu")
-        print("   • Run: sudo python3 main.py\n")
-        
-        print("2. 🐳 Docker Desktop")
-        print("   • Install Docker Desktop for Windows")
-        print("   • Open PowerShell in project directory")
-        print("   • Run: docker build -t secure-connection .")
-        print("   • Run: docker run --privileged --cap-add=NET_ADMIN -it secure-connection\n")
-        
-        print("3. 📦 VirtualBox/VMware")
-        print("   • Install Ubuntu 22.04 in a virtual machine")
-        print("   • Copy the project files to the VM")
-        print("   • Run the script inside the VM\n")
-        
-        print("4. ☁️  Cloud Instance")
-        print("   • Use AWS EC2, Google Cloud, or Azure")
-        print("   • Create Ubuntu 22.04 instance")
-        print("   • Upload and run the script\n")
-        
-        # Check for WSL
-        check_wsl_availability()
-        
-        # Check for Docker
-        check_docker_availability()
-        
-        return False
-    
-    return True
 
+# Printed as one block so the guidance costs a single write
+_WINDOWS_GUIDE = """\
+🖥️  Windows Environment Detected
+==================================================
+This script is designed for Linux systems (Ubuntu/Debian).
+Here are your options to run it on Windows:
 
-def check_wsl_availability():
-    """Check if WSL is available and configured."""
-    try:
-        result = subprocess.run(['wsl', '--list'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ WSL is installed and available")
-            if 'Ubuntu' in result.stdout:
-                print("✅ Ubuntu is installed in WSL")
-                print("💡 You can run: wsl -d Ubuntu")
-                print("   Then: sudo python3 main.py")
-            else:
-                print("⚠️  Ubuntu not found in WSL")
-                print("💡 Install Ubuntu: wsl --install Ubuntu-22.04")
-        else:
-            print("❌ WSL not available")
-            print("💡 Install WSL: wsl --install")
-    except FileNotFoundError:
-        print("❌ WSL command not found")
-        print("💡 Install WSL from Microsoft Store or run: wsl --install")
+1. 🐧 WSL (Windows Subsystem for Linux) - RECOMMENDED
+   • Open PowerShell as Administrator
+   • Run: wsl --install Ubuntu-22.04
+   • Restart your computer
+   • Open Ubuntu from Start Menu
+   • Run: sudo python3 main.py
 
+2. 🐳 Docker Desktop
+   • Install Docker Desktop for Windows
+   • Open PowerShell in project directory
+   • Run: docker build -t secure-connection .
+   • Run: docker run --privileged --cap-add=NET_ADMIN -it secure-connection
 
-def check_docker_availability():
-    """Check if Docker is available."""
-    try:
-        result = subprocess.run(['docker', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ Docker is available")
-            print("💡 You can build and run with Docker:")
-            print("   docker build -t secure-connection .")
-            print("   docker run --privileged --cap-add=NET_ADMIN -it secure-connection")
-        else:
-            print("❌ Docker not working properly")
-    except FileNotFoundError:
-        print("❌ Docker not found")
-        print("💡 Install Docker Desktop from docker.com")
+3. 📦 VirtualBox/VMware
+   • Install Ubuntu 22.04 in a virtual machine
+   • Copy the project files to the VM
+   • Run the script inside the VM
 
+4. ☁️  Cloud Instance
+   • Use AWS EC2, Google Cloud, or Azure
+   • Create Ubuntu 22.04 instance
+   • Upload and run the script
 
-def create_wsl_setup_script():
-    """Create a setup script for WSL."""
-    script_content = """#!/bin/bash
+"""
+
+_HEADER = """\
+🔒 Secure Connection Environment Check
+========================================
+"""
+
+_LINUX_READY = "\n".join((
+    "✅ Linux environment detected - you can run the script directly!",
+    "💡 Run: sudo python3 main.py",
+)) + "\n"
+
+_FOOTER = "\n".join((
+    "",
+    "=" * 50,
+    "📚 For more information, see README.md",
+    "🆘 If you need help, check the documentation",
+)) + "\n"
+
+
+# Contents written to setup_wsl.sh on Windows hosts
+_WSL_SETUP_SH = """#!/bin/bash
 # WSL Setup Script for Secure Connection
 
 echo "🐧 Setting up Ubuntu environment for Secure Connection Script"
@@ -121,27 +93,173 @@ chmod +x main.py
 echo "✅ Setup completed!"
 echo "Now you can run: sudo python3 main.py"
 """
+_WSL_SETUP_SH_BYTES = _WSL_SETUP_SH.encode('utf-8')
+_WSL_SETUP_SH_SHA = hashlib.sha256(_WSL_SETUP_SH_BYTES).digest()
+
+
+def check_windows_environment():
+    """Check if running on Windows and provide guidance."""
+    
+    if _IS_WINDOWS:
+        sys.stdout.write(_WINDOWS_GUIDE)
+        sys.stdout.flush()
+        
+        # Probe WSL and Docker concurrently; they are independent process spawns
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            wsl_future = executor.submit(_probe_wsl)
+            docker_future = executor.submit(_probe_docker)
+        
+        _render_wsl(wsl_future.result())
+        _render_docker(docker_future.result())
+        
+        return False
+    
+    return True
+
+
+# Upper bound on each probe; a broken WSL install can hang `wsl --list`
+_PROBE_TIMEOUT = 2
+
+# wsl.exe writes UTF-16LE unless WSL_UTF8=1 is set, in which case it writes UTF-8
+_UBUNTU_ENCODED = ('Ubuntu'.encode('utf-16-le'), b'Ubuntu')
+
+
+@dataclass(frozen=True)
+class WSLStatus:
+    """Result of probing for WSL."""
+    installed: bool
+    available: bool = False
+    has_ubuntu: bool = False
+    timed_out: bool = False
+
+
+@dataclass(frozen=True)
+class DockerStatus:
+    """Result of probing for Docker."""
+    installed: bool
+    working: bool = False
+    timed_out: bool = False
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_wsl():
+    """Run the WSL probe once per process; the answer does not change."""
+    # A PATH lookup is enough to rule WSL out without spawning a process
+    exe = shutil.which('wsl')
+    if exe is None:
+        return WSLStatus(installed=False)
     
-    with open('setup_wsl.sh', 'w') as f:
-        f.write(script_content)
+    import subprocess
+    try:
+        result = subprocess.run([exe, '--list'], capture_output=True, timeout=_PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return WSLStatus(installed=True, timed_out=True)
+    if result.returncode != 0:
+        return WSLStatus(installed=True)
+    # Match the encoded name on the raw bytes in either output encoding
+    return WSLStatus(installed=True, available=True,
+                     has_ubuntu=any(name in result.stdout for name in _UBUNTU_ENCODED))
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_docker():
+    """Run the Docker probe once per process; the answer does not change."""
+    exe = shutil.which('docker')
+    if exe is None:
+        return DockerStatus(installed=False)
+    
+    import subprocess
+    try:
+        result = subprocess.run([exe, '--version'], capture_output=True, timeout=_PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return DockerStatus(installed=True, timed_out=True)
+    return DockerStatus(installed=True, working=result.returncode == 0)
+
+
+def _render_wsl(status):
+    """Print guidance for a WSL probe result."""
+    if not status.installed:
+        print("❌ WSL command not found")
+        print("💡 Install WSL from Microsoft Store or run: wsl --install")
+    elif status.timed_out:
+        print("⚠️  WSL probe timed out")
+        print("💡 Try restarting WSL: wsl --shutdown")
+    elif not status.available:
+        print("❌ WSL not available")
+        print("💡 Install WSL: wsl --install")
+    else:
+        print("✅ WSL is installed and available")
+        if status.has_ubuntu:
+            print("✅ Ubuntu is installed in WSL")
+            print("💡 You can run: wsl -d Ubuntu")
+            print("   Then: sudo python3 main.py")
+        else:
+            print("⚠️  Ubuntu not found in WSL")
+            print("💡 Install Ubuntu: wsl --install Ubuntu-22.04")
+
+
+def _render_docker(status):
+    """Print guidance for a Docker probe result."""
+    if not status.installed:
+        print("❌ Docker not found")
+        print("💡 Install Docker Desktop from docker.com")
+    elif status.timed_out:
+        print("⚠️  Docker probe timed out")
+    elif not status.working:
+        print("❌ Docker not working properly")
+    else:
+        print("✅ Docker is available")
+        print("💡 You can build and run with Docker:")
+        print("   docker build -t secure-connection .")
+        print("   docker run --privileged --cap-add=NET_ADMIN -it secure-connection")
+
+
+def check_wsl_availability():
+    """Check if WSL is available and configured."""
+    _render_wsl(_probe_wsl())
+
+
+def check_docker_availability():
+    """Check if Docker is available."""
+    _render_docker(_probe_docker())
+
+
+def create_wsl_setup_script():
+    """Create a setup script for WSL, leaving an identical existing copy alone."""
+    from pathlib import Path
+    
+    script = Path('setup_wsl.sh')
+    
+    try:
+        # A size mismatch settles it from one stat; only same-size files get hashed
+        unchanged = (script.stat().st_size == len(_WSL_SETUP_SH_BYTES) and
+                     hashlib.sha256(script.read_bytes()).digest() == _WSL_SETUP_SH_SHA)
+    except FileNotFoundError:
+        unchanged = False
+    
+    if unchanged:
+        print("📄 setup_wsl.sh is already up to date")
+    else:
+        # Written as bytes so Windows newline translation can't break the script
+        script.write_bytes(_WSL_SETUP_SH_BYTES)
+        print("📄 Created setup_wsl.sh for easy WSL setup")
     
-    print("📄 Created setup_wsl.sh for easy WSL setup")
     print("💡 In WSL, run: bash setup_wsl.sh")
 
 
 def main():
     """Main function to check environment and provide guidance."""
-    print("🔒 Secure Connection Environment Check")
-    print("="*40)
+    sys.stdout.write(_HEADER)
     
-    if check_windows_environment():
-        print("✅ Linux environment detected - you can run the script directly!")
-        print("💡 Run: sudo python3 main.py")
-    else:
-        create_wsl_setup_script()
-        print("\n" + "="*50)
-        print("📚 For more information, see README.md")
-        print("🆘 If you need help, check the documentation")
+    # Linux fast path: none of the Windows probing is needed
+    if not _IS_WINDOWS:
+        sys.stdout.write(_LINUX_READY)
+        return
+    
+    check_windows_environment()
+    create_wsl_setup_script()
+    sys.stdout.write(_FOOTER)
 
 
 if __name__ == "__main__":
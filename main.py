@@ -1,67 +1,206 @@
 #!/usr/bin/env python3
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import dns.resolver
+import dns.asyncresolver
 import time
-import argparse
+import asyncio
 import random
+import base64
 import os
 import sys
+import socket
+import select
+import signal
 import logging
 import re
+import csv
+import heapq
+import ipaddress
+import functools
+import threading
+import queue
+import atexit
 from datetime import datetime
+from types import SimpleNamespace
+from operator import itemgetter
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-# Configure logging
+# Configure logging; records are written by a background listener so the
+# probe threads never block on the console. QueueHandler applies the format,
+# so the listener's handler just writes the finished message.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[QueueHandler(_log_queue)]
 )
 
 # Constants
 VPN_GATE_CSV_URL = "https://www.vpngate.net/api/iphone/"
 DNS_RESOLV_CONF = "/etc/resolv.conf"
 DNSCRYPT_PROXY_TOML = "/etc/dnscrypt-proxy/dnscrypt-proxy.toml"
+DNSCRYPT_CONFIG = b"""\
+# DNSCrypt-proxy configuration
+listen_addresses = ['127.0.0.1:53', '[::1]:53']
+server_names = ['cloudflare', 'google']
+require_dnssec = true
+require_nolog = true
+require_nofilter = true
+ipv4_servers = true
+ipv6_servers = false
+block_unqualified = true
+block_undelegated = true
+reject_ttl = 600
+bootstrap_resolvers = ['9.9.9.9:53', '1.1.1.1:53']
+netprobe_timeout = 60
+cache = true
+cache_size = 4096
+cache_min_ttl = 2400
+cache_max_ttl = 86400
+cache_neg_min_ttl = 60
+cache_neg_max_ttl = 600
+"""
+DNSCRYPT_RESOLV_CONF = b"nameserver 127.0.0.1\noptions edns0\n"
+# Upper bound in seconds on each in-process DNS query
+DNS_QUERY_LIFETIME = 2.0
+DNS_TEST_DOMAINS = ("google.com", "cloudflare.com", "github.com")
+TEST_MODE = os.environ.get("TEST_MODE", "").lower() == "true"
+TUN_SYSFS_PATH = "/sys/class/net/tun0"
+VPN_CONNECT_TIMEOUT = 30
+RTMGRP_LINK = 0x1  # rtnetlink multicast group for link add/remove/change
+LOCAL_RESOLVERS = frozenset({"127.0.0.1", "::1"})
+NAMESERVER_RE = re.compile(rb'^nameserver\s+(\S+)', re.MULTILINE)
+# Unit file states `systemctl is-enabled` treats as enabled
+ENABLED_UNIT_STATES = frozenset({
+    "enabled", "enabled-runtime", "static", "alias", "indirect", "generated", "transient",
+})
+# How long resolv.conf and systemctl readings are reused within a status pass
+STATUS_CACHE_TTL = 2.0
+# How long a public IP lookup is reused; cleared whenever the route changes
+IP_CACHE_TTL = 30.0
+IP_SERVICES = (
+    "https://api.ipify.org",
+    "https://ifconfig.me/ip",
+    "https://icanhazip.com",
+)
+
+# Shared session so repeat requests to a host reuse the TCP/TLS connection
+# (and skip its DNS lookup); transient connect failures get a quick retry
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(pool_connections=len(IP_SERVICES) + 2,
+                                   pool_maxsize=len(IP_SERVICES),
+                                   max_retries=Retry(total=2, backoff_factor=0.2)))
 
+def _ttl_cache(ttl):
+    """Cache a zero-argument function's result for ttl seconds"""
+    def decorator(func):
+        lock = threading.Lock()
+        state = {"value": None, "expires": 0.0}
+        
+        @functools.wraps(func)
+        def wrapper():
+            # Holding the lock while refreshing lets concurrent callers share one probe
+            with lock:
+                now = time.monotonic()
+                if now >= state["expires"]:
+                    state["value"] = func()
+                    state["expires"] = now + ttl
+                return state["value"]
+        
+        def cache_clear():
+            with lock:
+                state["expires"] = 0.0
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+def _fetch_ip(url):
+    """Fetch the public IP from a single plain-text lookup service"""
+    # An address is at most ~45 bytes; don't pull a whole error page
+    with HTTP.get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        body = response.raw.read(128, decode_content=True)
+    ip = body.decode('utf-8', 'ignore').strip()
+    ipaddress.ip_address(ip)  # Raises ValueError on anything but an address
+    return ip
+
+@_ttl_cache(IP_CACHE_TTL)
 def get_current_ip():
-    """Get the current public IP address"""
+    """Get the current public IP address from whichever service answers first"""
+    executor = ThreadPoolExecutor(max_workers=len(IP_SERVICES))
+    pending = {executor.submit(_fetch_ip, url) for url in IP_SERVICES}
     try:
-        response = requests.get("https://api.ipify.org?format=json", timeout=10)
-        return response.json()["ip"]
-    except Exception as e:
-        logging.error(f"Error getting IP: {e}")
-        return "Unknown"
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    ip = future.result()
+                except Exception as e:
+                    logging.debug(f"IP lookup service failed: {e}")
+                    continue
+                if ip:
+                    return ip
+    finally:
+        # Don't wait on the slower services once we have an answer
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    logging.error("Error getting IP: no lookup service responded")
+    return "Unknown"
+
+# Successful location lookups by IP; an address doesn't move between calls
+_location_cache = {}
 
 def get_location(ip):
     """Get location information for an IP"""
+    cached = _location_cache.get(ip)
+    if cached is not None:
+        return cached
+    
     try:
-        response = requests.get(f"https://ipapi.co/{ip}/json/", timeout=10)
+        response = HTTP.get(f"https://ipapi.co/{ip}/json/", timeout=10)
         data = response.json()
-        return f"{data.get('city', 'Unknown')}, {data.get('country_name', 'Unknown')}"
+        location = f"{data.get('city', 'Unknown')}, {data.get('country_name', 'Unknown')}"
+        _location_cache[ip] = location
+        return location
     except Exception as e:
         logging.error(f"Error getting location: {e}")
         return "Unknown"
 
+@_ttl_cache(STATUS_CACHE_TTL)
 def get_dns_servers():
     """Get current DNS servers from resolv.conf"""
     dns_servers = []
     try:
-        with open(DNS_RESOLV_CONF, 'r') as f:
-            for line in f:
-                if line.startswith('nameserver'):
-                    dns_servers.append(line.split()[1])
+        with open(DNS_RESOLV_CONF, 'rb') as f:
+            data = f.read()
+        dns_servers = [match.decode() for match in NAMESERVER_RE.findall(data)]
     except Exception as e:
         logging.error(f"Error reading DNS configuration: {e}")
     
     return dns_servers
 
+@functools.lru_cache(maxsize=1)
+def get_resolver():
+    """Get the shared DNS resolver, built from resolv.conf on first use"""
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = DNS_QUERY_LIFETIME
+    return resolver
+
 def test_dns_speed():
     """Test DNS resolution speed"""
-    start = time.time()
+    start = time.perf_counter()
     try:
-        subprocess.run(["dig", "google.com", "+short"], 
-                      stdout=subprocess.PIPE, 
-                      stderr=subprocess.PIPE, 
-                      check=True)
-        end = time.time()
+        # Resolve in-process so the timing isn't dominated by spawning dig
+        get_resolver().resolve("google.com", "A")
+        end = time.perf_counter()
         return f"{(end - start)*1000:.2f}ms"
     except Exception as e:
         logging.error(f"Error testing DNS speed: {e}")
@@ -70,10 +209,8 @@ def test_dns_speed():
 def check_vpn_status():
     """Check if VPN is connected"""
     try:
-        result = subprocess.run(["ip", "link", "show", "tun0"], 
-                               stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE)
-        if result.returncode == 0:
+        # sysfs lists every interface, so this needs no `ip link` process
+        if os.path.exists(TUN_SYSFS_PATH):
             return "Connected"
         else:
             return "Not connected or not available"
@@ -81,54 +218,59 @@ def check_vpn_status():
         logging.error(f"Error checking VPN status: {e}")
         return "Error checking status"
 
+@_ttl_cache(STATUS_CACHE_TTL)
 def check_dnscrypt_status():
     """Check DNSCrypt service status"""
     service_status = "Not running"
     autostart_status = "Not enabled"
     
     try:
-        # Check if service is running
-        result = subprocess.run(["systemctl", "is-active", "dnscrypt-proxy"], 
+        # One systemctl call reports both the running and the autostart state
+        result = subprocess.run(["systemctl", "show", "dnscrypt-proxy",
+                                 "--property=ActiveState,UnitFileState"],
                                stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE)
-        if result.returncode == 0:
+                               stderr=subprocess.DEVNULL,
+                               text=True)
+        properties = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        if properties.get("ActiveState") == "active":
             service_status = "Running"
-        
-        # Check if autostart is enabled
-        result = subprocess.run(["systemctl", "is-enabled", "dnscrypt-proxy"], 
-                               stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE)
-        if result.returncode == 0:
+        if properties.get("UnitFileState") in ENABLED_UNIT_STATES:
             autostart_status = "Enabled"
     except Exception as e:
         logging.error(f"Error checking DNSCrypt status: {e}")
     
     return service_status, autostart_status
 
+def _uses_local_resolver(dns_servers):
+    """Check whether any configured nameserver is the local dnscrypt-proxy"""
+    return not LOCAL_RESOLVERS.isdisjoint(dns_servers)
+
 def test_dns_leak():
     """Test for DNS leaks"""
     try:
         # Simple check - see if we're using dnscrypt-proxy local port
-        dns_servers = get_dns_servers()
-        if "127.0.0.1" in dns_servers or "::1" in dns_servers:
-            return True
-        return False
+        return _uses_local_resolver(get_dns_servers())
     except Exception as e:
         logging.error(f"Error testing DNS leak: {e}")
         return False
 
-def test_ip_change(original_ip):
+def test_ip_change(original_ip, current_ip=None):
     """Test if IP has changed after VPN connection"""
-    current_ip = get_current_ip()
+    if current_ip is None:
+        current_ip = get_current_ip()
     return current_ip != original_ip and current_ip != "Unknown"
 
+async def _resolve_all(domains):
+    """Resolve every domain concurrently on one event loop"""
+    resolver = dns.asyncresolver.Resolver()
+    resolver.lifetime = DNS_QUERY_LIFETIME
+    return await asyncio.gather(*(resolver.resolve(domain, "A") for domain in domains))
+
 def test_dns_resolution():
     """Test if DNS resolution works"""
     try:
-        result = subprocess.run(["dig", "google.com", "+short"], 
-                              stdout=subprocess.PIPE, 
-                              stderr=subprocess.PIPE)
-        return result.returncode == 0 and len(result.stdout) > 0
+        answers = asyncio.run(_resolve_all(DNS_TEST_DOMAINS))
+        return all(len(answer) > 0 for answer in answers)
     except Exception as e:
         logging.error(f"Error testing DNS resolution: {e}")
         return False
@@ -138,8 +280,7 @@ def test_encrypted_dns():
     try:
         # Check if DNSCrypt is running and we're using localhost as DNS
         service_status, _ = check_dnscrypt_status()
-        dns_servers = get_dns_servers()
-        return service_status == "Running" and ("127.0.0.1" in dns_servers or "::1" in dns_servers)
+        return service_status == "Running" and _uses_local_resolver(get_dns_servers())
     except Exception as e:
         logging.error(f"Error testing encrypted DNS: {e}")
         return False
@@ -147,43 +288,87 @@ def test_encrypted_dns():
 def test_internet():
     """Test general internet connectivity"""
     try:
-        response = requests.get("https://www.google.com", timeout=5)
-        return response.status_code == 200
+        # A TCP handshake answers the question without paying for TLS and a page fetch
+        with socket.create_connection(("www.google.com", 443), timeout=5):
+            return True
     except Exception as e:
         logging.error(f"Error testing internet: {e}")
         return False
 
-def setup_vpngate():
-    """Connect to VPNGate VPN"""
+def kill_processes(name):
+    """SIGKILL every process whose command name is name; return whether any were found"""
+    killed = False
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/comm") as f:
+                if f.read().rstrip("\n") != name:
+                    continue
+            os.kill(int(entry.name), signal.SIGKILL)
+            killed = True
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            # The process exited while scanning, or isn't ours to kill
+            continue
+    return killed
+
+def wait_for_vpn(timeout):
+    """Wait up to timeout seconds for tun0, waking on kernel link events"""
+    deadline = time.monotonic() + timeout
+    
+    # Subscribe before the first check so a link created in between isn't missed
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        sock.bind((0, RTMGRP_LINK))
+    except (AttributeError, OSError) as e:
+        logging.debug(f"Netlink unavailable, polling for tun0 instead: {e}")
+        sock = None
+    
+    try:
+        while True:
+            if check_vpn_status() == "Connected":
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if sock is None:
+                time.sleep(min(0.5, remaining))
+            elif select.select([sock], [], [], remaining)[0]:
+                # Any link event just triggers a re-check, so drain it unparsed
+                sock.recv(65536)
+    finally:
+        if sock is not None:
+            sock.close()
+
+def _iter_openvpn_servers(lines):
+    """Yield (score, country, config) for each VPNGate CSV row with an OpenVPN config"""
+    for row in csv.reader(lines):
+        # Skip the '*' markers, the '#' header and empty lines
+        if not row or row[0].startswith(('*', '#')):
+            continue
+        if len(row) >= 15 and row[6]:  # Check if OpenVPN config exists
+            try:
+                score = int(row[2])
+            except ValueError:
+                score = 0
+            yield (score, row[5], row[14])
+
+def setup_vpngate(pending_install=None):
+    """Connect to VPNGate VPN
+    
+    pending_install is an optional future for a background package install,
+    waited on before openvpn starts changing the routes under it.
+    """
     logging.info("Setting up VPN connection through VPNGate...")
     
     try:
-        # Download VPNGate server list
-        response = requests.get(VPN_GATE_CSV_URL, timeout=15)
-        csv_data = response.text.split('\n')
-        
-        # Skip header and empty lines
-        server_list = [line for line in csv_data if line and not line.startswith('*')]
-        
-        if not server_list:
-            logging.error("Failed to get VPNGate server list")
-            return False
+        # Download the VPNGate server list and parse it as it streams in
+        with HTTP.get(VPN_GATE_CSV_URL, timeout=15, stream=True) as response:
+            response.encoding = 'utf-8'
+            # Keep only the top 5 by score and pick one randomly for load balancing
+            servers = _iter_openvpn_servers(response.iter_lines(decode_unicode=True))
+            top_servers = heapq.nlargest(5, servers, key=itemgetter(0))
         
-        # Filter for OpenVPN servers and sort by score
-        openvpn_servers = []
-        for server in server_list:
-            parts = server.split(',')
-            if len(parts) >= 15 and parts[6]:  # Check if OpenVPN config exists
-                score = int(parts[2]) if parts[2].isdigit() else 0
-                country = parts[5]
-                openvpn_config = parts[14]
-                openvpn_servers.append((score, country, openvpn_config))
-        
-        # Sort by score (highest first)
-        openvpn_servers.sort(reverse=True)
-        
-        # Take the top 5 servers and pick one randomly for load balancing
-        top_servers = openvpn_servers[:5]
         if not top_servers:
             logging.error("No suitable VPN servers found")
             return False
@@ -193,26 +378,29 @@ def setup_vpngate():
         
         # Save OpenVPN config to file
         with open("/tmp/vpngate.ovpn", "w") as f:
-            import base64
             ovpn_config = base64.b64decode(chosen[2]).decode('utf-8')
             f.write(ovpn_config)
         
-        # Kill any existing OpenVPN processes
-        subprocess.run(["pkill", "-9", "openvpn"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
+        # Let the background install finish its downloads on the original routes
+        if pending_install is not None:
+            logging.info("Waiting for the DNSCrypt-proxy install to finish...")
+            pending_install.result()
+        
+        # Kill any existing OpenVPN processes, giving their tunnels time to go away
+        if kill_processes("openvpn"):
+            time.sleep(2)
         
         # Start OpenVPN as a background process
-        process = subprocess.Popen(["openvpn", "--config", "/tmp/vpngate.ovpn"], 
-                                  stdout=subprocess.PIPE, 
-                                  stderr=subprocess.PIPE)
+        # Its output is never read; an undrained pipe would eventually block it
+        subprocess.Popen(["openvpn", "--config", "/tmp/vpngate.ovpn"], 
+                         stdout=subprocess.DEVNULL, 
+                         stderr=subprocess.DEVNULL)
         
         # Wait for connection to establish
         logging.info("Waiting for VPN connection to establish...")
-        for _ in range(30):  # Wait up to 30 seconds
-            if check_vpn_status() == "Connected":
-                logging.info("VPN connected successfully")
-                return True
-            time.sleep(1)
+        if wait_for_vpn(VPN_CONNECT_TIMEOUT):
+            logging.info("VPN connected successfully")
+            return True
         
         logging.error("VPN connection timed out")
         return False
@@ -221,55 +409,65 @@ def setup_vpngate():
         logging.error(f"Error setting up VPN: {e}")
         return False
 
+def write_file_atomic(path, data):
+    """Write bytes to path through a temporary file and rename, so readers never see it half-written"""
+    tmp_path = f"{path}.new"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Docker bind-mounts /etc/resolv.conf, which can't be renamed over
+        os.remove(tmp_path)
+        with open(path, "wb") as f:
+            f.write(data)
+
+def install_dnscrypt():
+    """Install the DNSCrypt-proxy package if it isn't already present"""
+    if os.path.exists("/usr/sbin/dnscrypt-proxy"):
+        return True
+    
+    logging.info("Installing DNSCrypt-proxy...")
+    try:
+        subprocess.run(["apt-get", "update"], check=True)
+        subprocess.run(["apt-get", "install", "-y", "dnscrypt-proxy"], check=True)
+        return True
+    except Exception as e:
+        logging.error(f"Error installing DNSCrypt: {e}")
+        return False
+
 def setup_dnscrypt():
     """Set up DNSCrypt-proxy"""
     logging.info("Setting up DNSCrypt-proxy...")
     
+    if not install_dnscrypt():
+        return False
+    
     try:
-        # Install dnscrypt-proxy if not installed
-        if not os.path.exists("/usr/sbin/dnscrypt-proxy"):
-            logging.info("Installing DNSCrypt-proxy...")
-            subprocess.run(["apt-get", "update"], check=True)
-            subprocess.run(["apt-get", "install", "-y", "dnscrypt-proxy"], check=True)
-        
         # Create a new configuration file
-        with open(DNSCRYPT_PROXY_TOML, "w") as f:
-            f.write("""
-# DNSCrypt-proxy configuration
-listen_addresses = ['127.0.0.1:53', '[::1]:53']
-server_names = ['cloudflare', 'google']
-require_dnssec = true
-require_nolog = true
-require_nofilter = true
-ipv4_servers = true
-ipv6_servers = false
-block_unqualified = true
-block_undelegated = true
-reject_ttl = 600
-bootstrap_resolvers = ['9.9.9.9:53', '1.1.1.1:53']
-netprobe_timeout = 60
-cache = true
-cache_size = 4096
-cache_min_ttl = 2400
-cache_max_ttl = 86400
-cache_neg_min_ttl = 60
-cache_neg_max_ttl = 600
-            """)
+        write_file_atomic(DNSCRYPT_PROXY_TOML, DNSCRYPT_CONFIG)
 
         # Stop existing service if running
         subprocess.run(["systemctl", "stop", "dnscrypt-proxy"], 
-                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Start service
-        subprocess.run(["systemctl", "start", "dnscrypt-proxy"], check=True)
+                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         
-        # Enable autostart
-        subprocess.run(["systemctl", "enable", "dnscrypt-proxy"], check=True)
+        # Start service and enable autostart
+        subprocess.run(["systemctl", "enable", "--now", "dnscrypt-proxy"], check=True)
         
         # Update resolv.conf to use DNSCrypt
-        with open(DNS_RESOLV_CONF, "w") as f:
-            f.write("nameserver 127.0.0.1\n")
-            f.write("options edns0\n")
+        write_file_atomic(DNS_RESOLV_CONF, DNSCRYPT_RESOLV_CONF)
+        
+        # Drop cached readings taken before the reconfiguration
+        get_dns_servers.cache_clear()
+        check_dnscrypt_status.cache_clear()
+        get_resolver.cache_clear()
         
         # Check if service is running
         time.sleep(2)  # Give it time to start
@@ -285,53 +483,93 @@ cache_neg_max_ttl = 600
         logging.error(f"Error setting up DNSCrypt: {e}")
         return False
 
-def status_report():
-    """Print current connection status"""
-    original_ip = get_current_ip()
-    location = get_location(original_ip)
-    dns_servers = get_dns_servers()
-    dns_speed = test_dns_speed()
-    vpn_status = check_vpn_status()
-    dnscrypt_service, dnscrypt_autostart = check_dnscrypt_status()
+def status_report(original_ip=None):
+    """Print current connection status
     
-    # Tests
-    dns_leak_test = test_dns_leak()
-    ip_change_test = test_ip_change(original_ip)
-    dns_resolution_test = test_dns_resolution()
-    encrypted_dns_test = test_encrypted_dns()
-    internet_test = test_internet()
+    original_ip is the address seen before setup; without it the IP change
+    test has no baseline and reports no change.
+    """
+    # Every probe is independent I/O, so dispatch them all before rendering
+    with ThreadPoolExecutor(max_workers=9) as executor:
+        ip_future = executor.submit(get_current_ip)
+        dns_servers_future = executor.submit(get_dns_servers)
+        dns_speed_future = executor.submit(test_dns_speed)
+        vpn_status_future = executor.submit(check_vpn_status)
+        dnscrypt_future = executor.submit(check_dnscrypt_status)
+        dns_leak_future = executor.submit(test_dns_leak)
+        dns_resolution_future = executor.submit(test_dns_resolution)
+        encrypted_dns_future = executor.submit(test_encrypted_dns)
+        internet_future = executor.submit(test_internet)
+        
+        # Location is the only probe that depends on another
+        current_ip = ip_future.result()
+        location_future = executor.submit(get_location, current_ip)
+    
+    if original_ip is None:
+        original_ip = current_ip
+    
+    location = location_future.result()
+    dns_servers = dns_servers_future.result()
+    dns_speed = dns_speed_future.result()
+    vpn_status = vpn_status_future.result()
+    dnscrypt_service, dnscrypt_autostart = dnscrypt_future.result()
+    
+    dns_leak_test = dns_leak_future.result()
+    ip_change_test = test_ip_change(original_ip, current_ip)
+    dns_resolution_test = dns_resolution_future.result()
+    encrypted_dns_test = encrypted_dns_future.result()
+    internet_test = internet_future.result()
     
-    # Print the report
-    print("\n============================================================")
-    print("📊 CURRENT CONNECTION STATUS")
-    print("============================================================")
-    print(f"🌐 Current IP: {original_ip}")
-    print(f"📍 Location: {location}")
-    print("")
-    print(f"🛡️  DNS Configuration:")
-    print(f"   DNS Servers: {', '.join(dns_servers)}")
     logging.info(f"Current DNS servers: {dns_servers}")
-    print(f"   DNS Speed: {dns_speed}")
-    print("")
-    print(f"🔗 VPN Status:")
-    print(f"   Status: {vpn_status}")
-    print("")
-    print(f"🔐 DNSCrypt Status:")
-    print(f"   Service: {dnscrypt_service}")
-    print(f"   Autostart: {dnscrypt_autostart}")
-    print("")
-    print(f"🧪 Quick Tests:")
-    print(f"   {'✅' if dns_leak_test else '❌'} DNS Leak Protection")
-    print(f"   {'✅' if ip_change_test else '❌'} IP Change Verification")
-    print(f"   {'✅' if dns_resolution_test else '❌'} DNS Resolution")
-    print(f"   {'✅' if encrypted_dns_test else '❌'} Encrypted DNS")
-    print(f"   {'✅' if internet_test else '❌'} Internet Connectivity")
-    print("============================================================")
+    
+    # Assemble the report and print it with a single write
+    report = [
+        "",
+        "============================================================",
+        "📊 CURRENT CONNECTION STATUS",
+        "============================================================",
+        f"🌐 Current IP: {current_ip}",
+        f"📍 Location: {location}",
+        "",
+        "🛡️  DNS Configuration:",
+        f"   DNS Servers: {', '.join(dns_servers)}",
+        f"   DNS Speed: {dns_speed}",
+        "",
+        "🔗 VPN Status:",
+        f"   Status: {vpn_status}",
+        "",
+        "🔐 DNSCrypt Status:",
+        f"   Service: {dnscrypt_service}",
+        f"   Autostart: {dnscrypt_autostart}",
+        "",
+        "🧪 Quick Tests:",
+        f"   {'✅' if dns_leak_test else '❌'} DNS Leak Protection",
+        f"   {'✅' if ip_change_test else '❌'} IP Change Verification",
+        f"   {'✅' if dns_resolution_test else '❌'} DNS Resolution",
+        f"   {'✅' if encrypted_dns_test else '❌'} Encrypted DNS",
+        f"   {'✅' if internet_test else '❌'} Internet Connectivity",
+        "============================================================",
+    ]
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
 
-def main():
+@functools.lru_cache(maxsize=1)
+def build_parser():
+    """Build the command-line parser once per process"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Secure Connection Script")
     parser.add_argument("--status-only", action="store_true", help="Only show status without making changes")
-    args = parser.parse_args()
+    return parser
+
+def parse_cli(argv):
+    """Parse command-line flags, only loading argparse for help or bad input"""
+    if all(arg == "--status-only" for arg in argv):
+        return SimpleNamespace(status_only=bool(argv))
+    return build_parser().parse_args(argv)
+
+def main():
+    args = parse_cli(sys.argv[1:])
     
     # Just report status if requested
     if args.status_only:
@@ -340,22 +578,28 @@ def main():
     
     # Otherwise, proceed with the full setup
     print("🚀 Starting secure connection setup...")
+    original_ip = get_current_ip()
     
-    # 1. Setup VPN
-    if setup_vpngate():
-        print("✅ VPN setup completed")
-    else:
-        print("❌ VPN setup failed")
+    # 1. Setup VPN, installing the DNSCrypt package in the background while the
+    #    server list is fetched; the tunnel only comes up once the install is done
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dnscrypt_install = executor.submit(install_dnscrypt)
+        
+        if setup_vpngate(dnscrypt_install):
+            print("✅ VPN setup completed")
+        else:
+            print("❌ VPN setup failed")
     
-    # 2. Setup DNSCrypt
+    # 2. Setup DNSCrypt (the install above has finished by now)
     if setup_dnscrypt():
         print("✅ DNSCrypt setup completed")
     else:
         print("❌ DNSCrypt setup failed")
     
-    # 3. Final status report
+    # 3. Final status report; the public IP may have changed with the VPN
+    get_current_ip.cache_clear()
     print("\n🔍 Final connection status:")
-    status_report()
+    status_report(original_ip)
 
 if __name__ == "__main__":
     # Check if running in Docker with appropriate permissions
@@ -364,7 +608,7 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Check if in test mode
-    if os.environ.get("TEST_MODE", "").lower() == "true":
+    if TEST_MODE:
         print("🧪 Running in test mode - showing status only")
         status_report()
         sys.exit(0)
@@ -10,14 +10,240 @@ Quad9, and others while backing up original DNS settings.
 import os
 import subprocess
 import logging
+import re
+import shlex
 import shutil
+import socket
+import asyncio
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Tuple, Optional
+
+try:
+    import aiodns
+except ImportError:  # optional, getaddrinfo is used without it
+    aiodns = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Predefined secure DNS servers, shared read-only by all configurators
+DNS_PROVIDERS = MappingProxyType({
+    'cloudflare': {
+        'name': 'Cloudflare DNS',
+        'primary': '1.1.1.1',
+        'secondary': '1.0.0.1',
+        'dot': 'cloudflare-dns.com',
+        'description': 'Fast and privacy-focused DNS'
+    },
+    'cloudflare_family': {
+        'name': 'Cloudflare for Families',
+        'primary': '1.1.1.3',
+        'secondary': '1.0.0.3',
+        'dot': 'family.cloudflare-dns.com',
+        'description': 'Cloudflare DNS with malware and adult content blocking'
+    },
+    'quad9': {
+        'name': 'Quad9 DNS',
+        'primary': '9.9.9.9',
+        'secondary': '149.112.112.112',
+        'dot': 'dns.quad9.net',
+        'description': 'Security-focused DNS with threat blocking'
+    },
+    'opendns': {
+        'name': 'OpenDNS',
+        'primary': '208.67.222.222',
+        'secondary': '208.67.220.220',
+        'description': 'Cisco OpenDNS with security and filtering'
+    },
+    'google': {
+        'name': 'Google Public DNS',
+        'primary': '8.8.8.8',
+        'secondary': '8.8.4.4',
+        'dot': 'dns.google',
+        'description': 'Google\'s fast public DNS service'
+    },
+    'adguard': {
+        'name': 'AdGuard DNS',
+        'primary': '94.140.14.14',
+        'secondary': '94.140.15.15',
+        'dot': 'dns.adguard-dns.com',
+        'description': 'DNS with ad and tracker blocking'
+    }
+})
+
+# nameserver lines in resolv.conf, separated by spaces or tabs
+NAMESERVER_RE = re.compile(rb'(?m)^[ \t]*nameserver[ \t]+(\S+)')
+
+# DNS= line of resolved.conf
+RESOLVED_DNS_RE = re.compile(r'(?m)^[ \t]*DNS=(.*)$')
+
+# DNS-over-TLS server names by IP, for providers that offer DoT
+DOT_HOSTNAMES = MappingProxyType({
+    ip: provider['dot']
+    for provider in DNS_PROVIDERS.values() if 'dot' in provider
+    for ip in (provider['primary'], provider['secondary'])
+})
+
+# systemd 247 is the first release that accepts 'ip#server-name' DNS= entries
+RESOLVED_DOT_NAME_MIN_VERSION = 247
+
+# systemd-resolved configuration, filled in with the space-separated DNS servers.
+# DNSOverTLS is opportunistic so networks that block port 853 keep resolving.
+RESOLVED_CONF_TEMPLATE = """[Resolve]
+DNS={dns}
+FallbackDNS=
+Domains=~.
+DNSSEC=yes
+DNSOverTLS=opportunistic
+Cache=yes
+CacheFromLocalhost=yes
+"""
+
+# Address of the systemd-resolved stub listener
+RESOLVED_STUB_ADDRESS = "127.0.0.53"
+
+# /etc/resolv.conf pointing at the systemd-resolved stub listener
+RESOLVED_STUB_RESOLV_CONF = """# This file is managed by systemd-resolved
+nameserver 127.0.0.53
+options edns0 trust-ad
+search .
+"""
+
+# Cheapest systemd-resolved cache flush first; the shell stops at the first success
+FLUSH_CACHE_SCRIPT = (
+    "resolvectl flush-caches 2>/dev/null"
+    " || systemd-resolve --flush-caches 2>/dev/null"
+    " || systemctl reload systemd-resolved 2>/dev/null"
+    " || systemctl restart systemd-resolved"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _systemd_version() -> int:
+    """
+    Get the major version of the running systemd.
+    
+    Returns:
+        int: systemd version, or 0 if it could not be determined
+    """
+    try:
+        result = subprocess.run(["systemctl", "--version"],
+                                capture_output=True, text=True, timeout=5)
+        return int(result.stdout.split()[1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        return 0
+
+
+def _copy_atomic(src: Path, dst: Path) -> None:
+    """
+    Copy a file with in-kernel sendfile and atomically move it into place.
+    
+    Args:
+        src (Path): File to copy
+        dst (Path): Destination path, replaced atomically
+    """
+    tmp = dst.with_name(dst.name + ".tmp")
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        st = os.fstat(src_fd)
+        dst_fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, st.st_mode & 0o777)
+        try:
+            offset = 0
+            while offset < st.st_size:
+                sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            os.fsync(dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    os.replace(tmp, dst)
+    shutil.copystat(src, dst)
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """
+    Write a text file through a temporary file and atomic rename.
+    
+    Readers never see a truncated or half-written file. Symlinks are
+    followed, so a linked /etc/resolv.conf stays a link and the file it
+    points to is replaced. If the target can't be renamed over (Docker
+    bind-mounts /etc/resolv.conf), it is rewritten in place instead.
+    
+    Args:
+        path (Path): File to write
+        content (str): New file content
+    """
+    path = Path(os.path.realpath(path))
+    
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    
+    with tempfile.NamedTemporaryFile('w', dir=path.parent, prefix=f".{path.name}.",
+                                     delete=False) as tmp:
+        tmp.write(content)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        os.fchmod(tmp.fileno(), mode)
+    
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.remove(tmp.name)
+        path.write_text(content)
+
+
+async def _resolve_all(domains: List[str], servers: Tuple[str, ...]) -> List[bool]:
+    """
+    Resolve A records for all domains concurrently on one aiodns resolver.
+    
+    Args:
+        domains (List[str]): Domains to resolve
+        servers (Tuple[str, ...]): DNS server IP addresses, or empty for the system ones
+        
+    Returns:
+        List[bool]: Per-domain resolution result, in input order
+    """
+    resolver = aiodns.DNSResolver(nameservers=list(servers) or None)
+    
+    async def probe(domain: str) -> bool:
+        try:
+            await asyncio.wait_for(resolver.query(domain, 'A'), 5)
+            return True
+        except Exception as e:
+            logger.debug("DNS query for %s failed: %s", domain, e)
+            return False
+    
+    return await asyncio.gather(*(probe(domain) for domain in domains))
+
+
+def _probe_system(domain: str) -> bool:
+    """
+    Check that a domain resolves through the system resolver.
+    
+    Used when aiodns is not installed.
+    
+    Args:
+        domain (str): Domain to resolve
+        
+    Returns:
+        bool: True if the domain resolved, False otherwise
+    """
+    try:
+        socket.getaddrinfo(domain, None, family=socket.AF_INET)
+        return True
+    except Exception as e:
+        logger.debug("DNS query for %s failed: %s", domain, e)
+        return False
+
 
 class DNSConfigurator:
     """
@@ -35,46 +261,8 @@ class DNSConfigurator:
         self.resolv_conf_backup = Path("/etc/resolv.conf.backup")
         self.systemd_resolved_conf = Path("/etc/systemd/resolved.conf")
         self.systemd_resolved_backup = Path("/etc/systemd/resolved.conf.backup")
-        
-        # Predefined secure DNS servers
-        self.dns_providers = {
-            'cloudflare': {
-                'name': 'Cloudflare DNS',
-                'primary': '1.1.1.1',
-                'secondary': '1.0.0.1',
-                'description': 'Fast and privacy-focused DNS'
-            },
-            'cloudflare_family': {
-                'name': 'Cloudflare for Families',
-                'primary': '1.1.1.3',
-                'secondary': '1.0.0.3',
-                'description': 'Cloudflare DNS with malware and adult content blocking'
-            },
-            'quad9': {
-                'name': 'Quad9 DNS',
-                'primary': '9.9.9.9',
-                'secondary': '149.112.112.112',
-                'description': 'Security-focused DNS with threat blocking'
-            },
-            'opendns': {
-                'name': 'OpenDNS',
-                'primary': '208.67.222.222',
-                'secondary': '208.67.220.220',
-                'description': 'Cisco OpenDNS with security and filtering'
-            },
-            'google': {
-                'name': 'Google Public DNS',
-                'primary': '8.8.8.8',
-                'secondary': '8.8.4.4',
-                'description': 'Google\'s fast public DNS service'
-            },
-            'adguard': {
-                'name': 'AdGuard DNS',
-                'primary': '94.140.14.14',
-                'secondary': '94.140.15.15',
-                'description': 'DNS with ad and tracker blocking'
-            }
-        }
+        self._just_restarted = False
+        self.dns_providers = DNS_PROVIDERS
     
     def backup_current_dns(self) -> bool:
         """
@@ -85,21 +273,26 @@ class DNSConfigurator:
         """
         logger.info("Backing up current DNS configuration...")
         
+        # Back up /etc/resolv.conf and the systemd-resolved configuration if they exist
+        pairs = [(src, dst) for src, dst in (
+            (self.resolv_conf_path, self.resolv_conf_backup),
+            (self.systemd_resolved_conf, self.systemd_resolved_backup),
+        ) if src.exists()]
+        
         try:
-            # Backup /etc/resolv.conf if it exists
-            if self.resolv_conf_path.exists():
-                shutil.copy2(self.resolv_conf_path, self.resolv_conf_backup)
-                logger.info(f"Backed up {self.resolv_conf_path} to {self.resolv_conf_backup}")
+            # The copies touch independent files, so run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(_copy_atomic, src, dst) for src, dst in pairs]
+                for future in futures:
+                    future.result()
             
-            # Backup systemd-resolved configuration if it exists
-            if self.systemd_resolved_conf.exists():
-                shutil.copy2(self.systemd_resolved_conf, self.systemd_resolved_backup)
-                logger.info(f"Backed up {self.systemd_resolved_conf} to {self.systemd_resolved_backup}")
+            for src, dst in pairs:
+                logger.info("Backed up %s to %s", src, dst)
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to backup DNS configuration: {e}")
+            logger.error("Failed to backup DNS configuration: %s", e)
             return False
     
     def get_current_dns(self) -> List[str]:
@@ -114,38 +307,50 @@ class DNSConfigurator:
         try:
             # Read from /etc/resolv.conf
             if self.resolv_conf_path.exists():
-                with open(self.resolv_conf_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line.startswith('nameserver '):
-                            dns_ip = line.split()[1]
-                            dns_servers.append(dns_ip)
+                data = self.resolv_conf_path.read_bytes()
+                dns_servers = [m.decode() for m in NAMESERVER_RE.findall(data)]
             
-            logger.info(f"Current DNS servers: {dns_servers}")
+            logger.info("Current DNS servers: %s", dns_servers)
+            
+            # Report systemd-resolved cache hit/miss counters when debugging
+            if logger.isEnabledFor(logging.DEBUG) and self.is_systemd_resolved_active():
+                try:
+                    stats = subprocess.run(["resolvectl", "statistics"],
+                                           capture_output=True, text=True, timeout=5)
+                    if stats.returncode == 0:
+                        logger.debug("systemd-resolved statistics:\n%s", stats.stdout.rstrip())
+                except (OSError, subprocess.SubprocessError) as e:
+                    logger.debug("Could not read systemd-resolved statistics: %s", e)
             return dns_servers
             
         except Exception as e:
-            logger.error(f"Failed to get current DNS configuration: {e}")
+            logger.error("Failed to get current DNS configuration: %s", e)
             return []
     
     def is_systemd_resolved_active(self) -> bool:
         """
         Check if systemd-resolved is active and managing DNS.
         
+        Asked fresh on every call, since configure and restore can start or
+        restart the service.
+        
         Returns:
             bool: True if systemd-resolved is active, False otherwise
         """
         try:
             result = subprocess.run(
-                ["systemctl", "is-active", "systemd-resolved"],
-                capture_output=True,
-                text=True
+                ["systemctl", "is-active", "--quiet", "systemd-resolved"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5
             )
-            return result.returncode == 0 and "active" in result.stdout
-            
-        except Exception as e:
-            logger.debug(f"Could not check systemd-resolved status: {e}")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug("Could not query systemd-resolved state: %s", e)
             return False
+        
+        active = result.returncode == 0
+        logger.debug("systemd-resolved active: %s", active)
+        return active
     
     def configure_systemd_resolved(self, dns_servers: List[str]) -> bool:
         """
@@ -160,38 +365,30 @@ class DNSConfigurator:
         logger.info("Configuring DNS using systemd-resolved...")
         
         try:
-            # Create systemd-resolved configuration
-            config_content = f"""[Resolve]
-DNS={' '.join(dns_servers)}
-FallbackDNS=
-Domains=~.
-DNSSEC=yes
-DNSOverTLS=opportunistic
-Cache=yes
-"""
+            # Create systemd-resolved configuration, pinning DoT names where known
+            # and where this systemd understands the 'ip#name' syntax
+            if _systemd_version() >= RESOLVED_DOT_NAME_MIN_VERSION:
+                dns_entries = [f"{ip}#{DOT_HOSTNAMES[ip]}" if ip in DOT_HOSTNAMES else ip
+                               for ip in dns_servers]
+            else:
+                dns_entries = list(dns_servers)
+            config_content = RESOLVED_CONF_TEMPLATE.format(dns=' '.join(dns_entries))
             
             # Write configuration
-            with open(self.systemd_resolved_conf, 'w') as f:
-                f.write(config_content)
+            _atomic_write(self.systemd_resolved_conf, config_content)
             
-            # Restart systemd-resolved
+            # Restart systemd-resolved, which also starts it with an empty cache
             subprocess.run(["systemctl", "restart", "systemd-resolved"], check=True)
+            self._just_restarted = True
             
             # Ensure /etc/resolv.conf points to systemd-resolved
-            stub_resolv_content = """# This file is managed by systemd-resolved
-nameserver 127.0.0.53
-options edns0 trust-ad
-search .
-"""
-            
-            with open(self.resolv_conf_path, 'w') as f:
-                f.write(stub_resolv_content)
+            _atomic_write(self.resolv_conf_path, RESOLVED_STUB_RESOLV_CONF)
             
             logger.info("systemd-resolved DNS configuration completed")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to configure systemd-resolved: {e}")
+            logger.error("Failed to configure systemd-resolved: %s", e)
             return False
     
     def configure_resolv_conf(self, dns_servers: List[str]) -> bool:
@@ -207,20 +404,19 @@ search .
         logger.info("Configuring DNS using /etc/resolv.conf...")
         
         try:
-            # Create new resolv.conf content
-            resolv_content = "# Custom DNS configuration\n"
-            for dns_server in dns_servers:
-                resolv_content += f"nameserver {dns_server}\n"
-            
-            # Add options for better performance and security
-            resolv_content += "options timeout:2\n"
-            resolv_content += "options attempts:3\n"
-            resolv_content += "options rotate\n"
-            resolv_content += "options single-request-reopen\n"
+            # Create new resolv.conf content, with options for better performance and security
+            resolv_content = "\n".join([
+                "# Custom DNS configuration",
+                *("nameserver " + dns_server for dns_server in dns_servers),
+                "options timeout:2",
+                "options attempts:3",
+                "options rotate",
+                "options single-request-reopen",
+                "",
+            ])
             
             # Write new configuration
-            with open(self.resolv_conf_path, 'w') as f:
-                f.write(resolv_content)
+            _atomic_write(self.resolv_conf_path, resolv_content)
             
             # Make file immutable to prevent other services from modifying it
             subprocess.run(["chattr", "+i", str(self.resolv_conf_path)], 
@@ -230,7 +426,7 @@ search .
             return True
             
         except Exception as e:
-            logger.error(f"Failed to configure resolv.conf: {e}")
+            logger.error("Failed to configure resolv.conf: %s", e)
             return False
     
     def flush_dns_cache(self) -> bool:
@@ -240,24 +436,24 @@ search .
         Returns:
             bool: True if cache flush successful, False otherwise
         """
+        if self._just_restarted:
+            # systemd-resolved was just restarted, so its cache is already empty
+            self._just_restarted = False
+            logger.info("DNS cache already cleared by systemd-resolved restart")
+            return True
+        
         logger.info("Flushing DNS cache...")
         
         try:
-            # Try different methods to flush DNS cache
-            flush_commands = [
-                ["systemctl", "restart", "systemd-resolved"],
-                ["systemctl", "reload", "systemd-resolved"],
-                ["resolvectl", "flush-caches"],
-                ["systemd-resolve", "--flush-caches"]
-            ]
-            
-            for cmd in flush_commands:
-                try:
-                    subprocess.run(cmd, check=True, capture_output=True)
-                    logger.info(f"DNS cache flushed using: {' '.join(cmd)}")
-                    return True
-                except subprocess.CalledProcessError:
-                    continue
+            # Try the systemd flush methods in one shell, stopping at the first that works
+            result = subprocess.run(
+                ["sh", "-c", FLUSH_CACHE_SCRIPT],
+                capture_output=True,
+                timeout=10
+            )
+            if result.returncode == 0:
+                logger.info("DNS cache flushed using systemd-resolved")
+                return True
             
             # If systemd methods fail, try traditional methods
             try:
@@ -272,15 +468,23 @@ search .
             return True  # Don't fail the entire operation for this
             
         except Exception as e:
-            logger.error(f"Error while flushing DNS cache: {e}")
+            logger.error("Error while flushing DNS cache: %s", e)
             return True  # Don't fail the entire operation for this
     
-    def test_dns_resolution(self, test_domains: Optional[List[str]] = None) -> bool:
+    def test_dns_resolution(self, test_domains: Optional[List[str]] = None,
+                            dns_servers: Optional[List[str]] = None) -> bool:
         """
         Test DNS resolution with configured servers.
         
+        With aiodns installed all domains are queried concurrently on a single
+        event loop against dns_servers (or the system resolvers if not given);
+        otherwise they are looked up in parallel with socket.getaddrinfo.
+        Results are never cached, so a check after reconfiguring always
+        reflects the new settings.
+        
         Args:
             test_domains (Optional[List[str]]): Domains to test resolution for
+            dns_servers (Optional[List[str]]): DNS server IP addresses to query
             
         Returns:
             bool: True if DNS resolution is working, False otherwise
@@ -290,28 +494,20 @@ search .
         
         logger.info("Testing DNS resolution...")
         
-        for domain in test_domains:
-            try:
-                # Test DNS resolution using nslookup
-                result = subprocess.run(
-                    ["nslookup", domain],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0 and "NXDOMAIN" not in result.stdout:
-                    logger.info(f"DNS resolution test passed for {domain}")
-                else:
-                    logger.error(f"DNS resolution test failed for {domain}")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                logger.error(f"DNS resolution test timed out for {domain}")
-                return False
-            except Exception as e:
-                logger.error(f"DNS resolution test error for {domain}: {e}")
-                return False
+        if aiodns is not None:
+            results = asyncio.run(_resolve_all(test_domains, tuple(dns_servers or ())))
+        else:
+            with ThreadPoolExecutor(max_workers=max(len(test_domains), 1)) as executor:
+                results = list(executor.map(_probe_system, test_domains))
+        
+        for domain, ok in zip(test_domains, results):
+            if ok:
+                logger.info("DNS resolution test passed for %s", domain)
+            else:
+                logger.error("DNS resolution test failed for %s", domain)
+        
+        if not all(results):
+            return False
         
         logger.info("All DNS resolution tests passed")
         return True
@@ -325,74 +521,125 @@ search .
         """
         logger.info("Restoring DNS configuration from backup...")
         
+        restore_resolv = self.resolv_conf_backup.exists()
+        restore_resolved = self.systemd_resolved_backup.exists()
+        
+        if not (restore_resolv or restore_resolved):
+            logger.warning("No DNS backup found to restore")
+            return False
+        
         try:
-            restored = False
-            
-            # Remove immutable flag if set
-            try:
-                subprocess.run(["chattr", "-i", str(self.resolv_conf_path)], 
-                             capture_output=True)
-            except:
-                pass
+            if shutil.which("sh"):
+                # Unlock, copy back and restart in a single subprocess
+                resolv_conf = shlex.quote(str(self.resolv_conf_path))
+                commands = ["set -e", f"chattr -i {resolv_conf} 2>/dev/null || true"]
+                if restore_resolv:
+                    commands.append(f"cp --preserve=all "
+                                    f"{shlex.quote(str(self.resolv_conf_backup))} {resolv_conf}")
+                if restore_resolved:
+                    commands.append(f"cp --preserve=all "
+                                    f"{shlex.quote(str(self.systemd_resolved_backup))} "
+                                    f"{shlex.quote(str(self.systemd_resolved_conf))}")
+                    commands.append("systemctl restart systemd-resolved >/dev/null 2>&1 || true")
+                
+                result = subprocess.run(["sh", "-c", "\n".join(commands)],
+                                        capture_output=True, text=True, check=False)
+                if result.returncode != 0:
+                    logger.error("Failed to restore DNS backup: %s", result.stderr.strip())
+                    return False
+            else:
+                # Remove immutable flag if set
+                try:
+                    subprocess.run(["chattr", "-i", str(self.resolv_conf_path)], 
+                                 capture_output=True)
+                except Exception:
+                    pass
+                
+                if restore_resolv:
+                    shutil.copy2(self.resolv_conf_backup, self.resolv_conf_path)
+                
+                if restore_resolved:
+                    shutil.copy2(self.systemd_resolved_backup, self.systemd_resolved_conf)
+                    subprocess.run(["systemctl", "restart", "systemd-resolved"], 
+                                 capture_output=True)
             
-            # Restore /etc/resolv.conf
-            if self.resolv_conf_backup.exists():
-                shutil.copy2(self.resolv_conf_backup, self.resolv_conf_path)
+            self._just_restarted = restore_resolved
+            if restore_resolv:
                 logger.info("Restored /etc/resolv.conf from backup")
-                restored = True
-            
-            # Restore systemd-resolved configuration
-            if self.systemd_resolved_backup.exists():
-                shutil.copy2(self.systemd_resolved_backup, self.systemd_resolved_conf)
-                subprocess.run(["systemctl", "restart", "systemd-resolved"], 
-                             capture_output=True)
+            if restore_resolved:
                 logger.info("Restored systemd-resolved configuration from backup")
-                restored = True
             
-            if restored:
-                self.flush_dns_cache()
-                logger.info("DNS configuration restored successfully")
-                return True
-            else:
-                logger.warning("No DNS backup found to restore")
-                return False
+            self.flush_dns_cache()
+            logger.info("DNS configuration restored successfully")
+            return True
                 
         except Exception as e:
-            logger.error(f"Failed to restore DNS backup: {e}")
+            logger.error("Failed to restore DNS backup: %s", e)
             return False
     
+    def is_dns_configured(self, dns_servers: List[str]) -> bool:
+        """
+        Check whether the system already resolves through exactly these servers.
+        
+        Args:
+            dns_servers (List[str]): List of DNS server IP addresses
+            
+        Returns:
+            bool: True if the current configuration matches, False otherwise
+        """
+        desired = set(dns_servers)
+        
+        if self.is_systemd_resolved_active():
+            try:
+                match = RESOLVED_DNS_RE.search(self.systemd_resolved_conf.read_text())
+            except OSError:
+                return False
+            # Entries may carry a '#dot-name' suffix
+            upstream = {entry.split('#', 1)[0] for entry in match.group(1).split()} if match else set()
+            return upstream == desired and set(self.get_current_dns()) == {RESOLVED_STUB_ADDRESS}
+        
+        return set(self.get_current_dns()) == desired
+    
     def configure_dns(self, provider: str = 'cloudflare', 
-                     custom_servers: Optional[List[str]] = None) -> bool:
+                     custom_servers: Optional[List[str]] = None,
+                     force: bool = False) -> bool:
         """
         Configure DNS with specified provider or custom servers.
         
         Args:
             provider (str): DNS provider name from predefined list
             custom_servers (Optional[List[str]]): Custom DNS server IP addresses
+            force (bool): Reconfigure even if the servers are already in use
             
         Returns:
             bool: True if configuration successful, False otherwise
         """
-        logger.info(f"Configuring DNS with provider: {provider}")
-        
-        # Backup current configuration
-        if not self.backup_current_dns():
-            return False
+        logger.info("Configuring DNS with provider: %s", provider)
         
         # Determine DNS servers to use
         if custom_servers:
             dns_servers = custom_servers
-            logger.info(f"Using custom DNS servers: {dns_servers}")
+            logger.info("Using custom DNS servers: %s", dns_servers)
         elif provider in self.dns_providers:
             dns_config = self.dns_providers[provider]
             dns_servers = [dns_config['primary'], dns_config['secondary']]
-            logger.info(f"Using {dns_config['name']}: {dns_servers}")
+            logger.info("Using %s: %s", dns_config['name'], dns_servers)
         else:
-            logger.error(f"Unknown DNS provider: {provider}")
+            logger.error("Unknown DNS provider: %s", provider)
+            return False
+        
+        # Nothing to do if these servers are already configured
+        if not force and self.is_dns_configured(dns_servers):
+            logger.info("DNS is already configured with %s", dns_servers)
+            return True
+        
+        # Backup current configuration
+        if not self.backup_current_dns():
             return False
         
         # Configure DNS based on system setup
-        if self.is_systemd_resolved_active():
+        use_resolved = self.is_systemd_resolved_active()
+        if use_resolved:
             success = self.configure_systemd_resolved(dns_servers)
         else:
             success = self.configure_resolv_conf(dns_servers)
@@ -401,11 +648,13 @@ search .
             logger.error("DNS configuration failed")
             return False
         
-        # Flush DNS cache
+        # Flush DNS cache (a no-op right after a systemd-resolved restart)
         self.flush_dns_cache()
         
-        # Test DNS resolution
-        if not self.test_dns_resolution():
+        # Test DNS resolution the way applications resolve: through the
+        # systemd-resolved stub, or through the rewritten /etc/resolv.conf
+        verify_servers = [RESOLVED_STUB_ADDRESS] if use_resolved else None
+        if not self.test_dns_resolution(dns_servers=verify_servers):
             logger.error("DNS resolution test failed, restoring backup")
             self.restore_dns_backup()
             return False
@@ -415,20 +664,22 @@ search .
 
 
 def configure_dns(provider: str = 'cloudflare', 
-                 custom_servers: Optional[List[str]] = None) -> Tuple[bool, Optional[str]]:
+                 custom_servers: Optional[List[str]] = None,
+                 force: bool = False) -> Tuple[bool, Optional[str]]:
     """
     Main function to configure DNS settings.
     
     Args:
         provider (str): DNS provider name ('cloudflare', 'quad9', 'google', etc.)
         custom_servers (Optional[List[str]]): Custom DNS server IP addresses
+        force (bool): Reconfigure even if the servers are already in use
         
     Returns:
         Tuple[bool, Optional[str]]: (success_status, error_message)
     """
     try:
         configurator = DNSConfigurator()
-        success = configurator.configure_dns(provider, custom_servers)
+        success = configurator.configure_dns(provider, custom_servers, force)
         
         if success:
             return True, None
@@ -441,21 +692,23 @@ def configure_dns(provider: str = 'cloudflare',
         return False, error_msg
 
 
-def list_dns_providers() -> Dict[str, Dict[str, str]]:
+@functools.lru_cache(maxsize=1)
+def list_dns_providers() -> Mapping[str, Dict[str, str]]:
     """
     Get list of available DNS providers.
     
     Returns:
-        Dict[str, Dict[str, str]]: Dictionary of available DNS providers
+        Mapping[str, Dict[str, str]]: Read-only mapping of available DNS providers
     """
-    configurator = DNSConfigurator()
-    return configurator.dns_providers
+    return DNS_PROVIDERS
 
 
 if __name__ == "__main__":
     """
     Direct execution for testing the DNS configurator.
     """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     print("Available DNS providers:")
     for key, provider in list_dns_providers().items():
         print(f"  {key}: {provider['name']} - {provider['description']}")
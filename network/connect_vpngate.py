@@ -10,18 +10,120 @@ and establishes a VPN connection.
 import os
 import subprocess
 import logging
+import re
 import csv
-import urllib.request
+import heapq
 import base64
 import time
 import random
+import socket
+import functools
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Iterator, NamedTuple, Tuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# First "remote <host> <port>" line of an OpenVPN config
+REMOTE_RE = re.compile(rb'^remote\s+(\S+)\s+(\S+)', re.M)
+
+# Number of VPNGate servers tried at the same time
+PARALLEL_ATTEMPTS = 3
+
+# Seconds a single vpncmd call may take before it is treated as hung
+VPNCMD_TIMEOUT = 30
+
+# Printed by vpncmd after each command that succeeds
+VPNCMD_SUCCESS_MARKER = "The command completed successfully."
+
+# Adapter name rows in vpncmd NicList output
+NIC_NAME_RE = re.compile(r'^Virtual Network Adapter Name\s*\|(.+?)\s*$', re.M)
+
+
+class Server(NamedTuple):
+    """
+    A VPNGate server entry, with fields in the order of the API's CSV columns.
+    
+    The remote_* fields are derived from the OpenVPN config; remote_ip is
+    only set once the remote host has been resolved.
+    """
+    hostname: str
+    ip: str
+    score: int
+    ping: int
+    speed: int
+    country_long: str
+    country_short: str
+    vpn_sessions: int
+    uptime: int
+    total_users: int
+    total_traffic: int
+    log_type: str
+    operator: str
+    message: str
+    config_data: str
+    remote_host: str = ''
+    remote_port: str = '1194'
+    remote_ip: str = ''
+
+
+@functools.lru_cache(maxsize=32)
+def _decode_config(config_data: str) -> str:
+    """
+    Decode a server's base64 OpenVPN config, caching recent results.
+    
+    Args:
+        config_data (str): Base64-encoded OpenVPN configuration
+        
+    Returns:
+        str: Decoded OpenVPN configuration
+    """
+    return base64.b64decode(config_data).decode('utf-8')
+
+
+def _to_int(value: str, default: int = 0) -> int:
+    """
+    Parse an integer CSV field, falling back to a default for bad values.
+    
+    Args:
+        value (str): Field text
+        default (int): Value to use if the field is not an integer
+        
+    Returns:
+        int: Parsed value or the default
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float, interval: float = 0.2) -> bool:
+    """
+    Poll a condition until it holds or the timeout expires.
+    
+    Args:
+        predicate (Callable[[], bool]): Condition to check
+        timeout (float): Maximum time to wait in seconds
+        interval (float): Delay between checks in seconds
+        
+    Returns:
+        bool: True if the condition held before the timeout, False otherwise
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
 
 class VPNGateConnector:
     """
@@ -31,60 +133,129 @@ class VPNGateConnector:
     and establishing VPN connections through SoftEther VPN client.
     """
     
-    def __init__(self, softether_dir: str = "/opt/softether"):
+    def __init__(self, softether_dir: str = "/opt/softether", cache_ttl: int = 300):
         """
         Initialize the VPNGate connector.
         
         Args:
             softether_dir (str): Directory where SoftEther is installed
+            cache_ttl (int): Seconds a downloaded server list is reused from disk
         """
         self.softether_dir = Path(softether_dir)
         self.vpnclient_path = self.softether_dir / "vpnclient"
         self.vpncmd_path = self.softether_dir / "vpncmd"
+        # Common vpncmd prefix, built once instead of per command
+        self.vpncmd_base = [str(self.vpncmd_path), "localhost", "/CLIENT", "/CMD"]
         self.vpngate_api_url = "http://www.vpngate.net/api/iphone/"
         self.connection_name = "VPNGate_Connection"
         self.virtual_hub_name = "VPN"
+        self.cache_path = Path.home() / ".cache" / "connections_script" / "vpngate.csv"
+        self.cache_ttl = cache_ttl
+        
+        # Keep-alive HTTP session so repeated server list fetches reuse the connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=4, max_retries=Retry(total=3, backoff_factor=0.3))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """
+        Release the HTTP session and its pooled connections.
+        """
+        self.session.close()
         
-    def fetch_vpngate_servers(self) -> List[Dict[str, str]]:
+    def _iter_vpngate_csv(self) -> Iterator[bytes]:
+        """
+        Yield the raw lines of the VPNGate server CSV.
+        
+        A cached copy younger than cache_ttl seconds is read from disk;
+        otherwise the API response is streamed and written through to the
+        cache as it is consumed.
+        
+        Returns:
+            Iterator[bytes]: CSV lines without line terminators
+        """
+        try:
+            st = self.cache_path.stat()
+            # A tiny file is a truncated earlier write, not a server list
+            fresh = time.time() - st.st_mtime < self.cache_ttl and st.st_size >= 1024
+        except OSError:
+            fresh = False
+        
+        if fresh:
+            logger.info(f"Using cached VPNGate server list from {self.cache_path}")
+            with open(self.cache_path, 'rb') as f:
+                for line in f:
+                    yield line.rstrip(b'\r\n')
+            return
+        
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        
+        with self.session.get(self.vpngate_api_url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as cache_file:
+                for line in response.iter_lines():
+                    cache_file.write(line + b'\n')
+                    yield line
+        
+        # Only a complete download replaces the cache
+        os.replace(tmp_path, self.cache_path)
+    
+    def fetch_vpngate_servers(self, preferred_countries: Optional[List[str]] = None) -> List[Server]:
         """
         Fetch available VPNGate servers from the API.
         
+        Args:
+            preferred_countries (Optional[List[str]]): Only return servers in these country codes
+        
         Returns:
-            List[Dict[str, str]]: List of server information dictionaries
+            List[Server]: List of server records
         """
         logger.info("Fetching VPNGate server list...")
         
+        pref_upper = frozenset(c.upper() for c in preferred_countries) if preferred_countries else None
+        
         try:
-            # Download CSV data from VPNGate API
-            response = urllib.request.urlopen(self.vpngate_api_url)
-            csv_data = response.read().decode('utf-8')
-            
-            # Parse CSV data
+            # Read CSV data from the local cache or the VPNGate API, decoding and parsing line by line.
+            # Blank, header and comment lines are dropped as bytes, before decoding or CSV parsing.
             servers = []
-            csv_reader = csv.reader(csv_data.strip().split('\n'))
+            lines = (line.decode('utf-8') for line in self._iter_vpngate_csv()
+                     if line and line[:1] != b'#')
             
-            # Skip header and comment lines
-            for row in csv_reader:
-                if row and not row[0].startswith('#') and len(row) > 10:
+            for row in csv.reader(lines):
+                # Reject other countries before the row is decoded or built into a record
+                if len(row) > 10 and (pref_upper is None or row[6].upper() in pref_upper):
                     try:
-                        server_info = {
-                            'hostname': row[0],
-                            'ip': row[1],
-                            'score': int(row[2]) if row[2].isdigit() else 0,
-                            'ping': int(row[3]) if row[3].isdigit() else 9999,
-                            'speed': int(row[4]) if row[4].isdigit() else 0,
-                            'country_long': row[5],
-                            'country_short': row[6],
-                            'vpn_sessions': int(row[7]) if row[7].isdigit() else 0,
-                            'uptime': int(row[8]) if row[8].isdigit() else 0,
-                            'total_users': int(row[9]) if row[9].isdigit() else 0,
-                            'total_traffic': int(row[10]) if row[10].isdigit() else 0,
-                            'log_type': row[11] if len(row) > 11 else '',
-                            'operator': row[12] if len(row) > 12 else '',
-                            'message': row[13] if len(row) > 13 else '',
-                            'config_data': row[14] if len(row) > 14 else ''
-                        }
-                        servers.append(server_info)
+                        config_data = row[14] if len(row) > 14 else ''
+                        
+                        # Parse the remote endpoint once here, so connect attempts skip the decode
+                        remote_host, remote_port = '', '1194'  # Default OpenVPN port
+                        if config_data:
+                            match = REMOTE_RE.search(base64.b64decode(config_data))
+                            if match:
+                                remote_host = match.group(1).decode()
+                                remote_port = match.group(2).decode()
+                        
+                        servers.append(Server(
+                            hostname=row[0],
+                            ip=row[1],
+                            score=_to_int(row[2]),
+                            ping=_to_int(row[3], 9999),
+                            speed=_to_int(row[4]),
+                            country_long=row[5],
+                            country_short=row[6],
+                            vpn_sessions=_to_int(row[7]),
+                            uptime=_to_int(row[8]),
+                            total_users=_to_int(row[9]),
+                            total_traffic=_to_int(row[10]),
+                            log_type=row[11] if len(row) > 11 else '',
+                            operator=row[12] if len(row) > 12 else '',
+                            message=row[13] if len(row) > 13 else '',
+                            config_data=config_data,
+                            remote_host=remote_host,
+                            remote_port=remote_port
+                        ))
                     except (ValueError, IndexError) as e:
                         logger.debug(f"Skipping malformed server entry: {e}")
                         continue
@@ -96,54 +267,85 @@ class VPNGateConnector:
             logger.error(f"Failed to fetch VPNGate servers: {e}")
             return []
     
-    def filter_servers(self, servers: List[Dict[str, str]], 
+    def filter_servers(self, servers: List[Server], 
                       min_score: int = 1000000,
                       max_ping: int = 500,
                       min_speed: int = 1000000,
-                      preferred_countries: Optional[List[str]] = None) -> List[Dict[str, str]]:
+                      preferred_countries: Optional[List[str]] = None,
+                      top_k: Optional[int] = 16) -> List[Server]:
         """
         Filter servers based on quality criteria.
         
         Args:
-            servers (List[Dict[str, str]]): List of server information
+            servers (List[Server]): List of server information
             min_score (int): Minimum server score
             max_ping (int): Maximum acceptable ping (ms)
             min_speed (int): Minimum speed requirement
             preferred_countries (Optional[List[str]]): List of preferred country codes
+            top_k (Optional[int]): Number of best servers to return, or None for all
             
         Returns:
-            List[Dict[str, str]]: Filtered and sorted server list
+            List[Server]: Filtered and sorted server list
         """
         logger.info("Filtering VPNGate servers...")
         
-        filtered_servers = []
-        
-        for server in servers:
-            # Apply filters
-            if (server['score'] >= min_score and
-                server['ping'] <= max_ping and
-                server['speed'] >= min_speed and
-                server['config_data']):  # Must have config data
-                
-                # Check preferred countries if specified
-                if preferred_countries:
-                    if server['country_short'].upper() in [c.upper() for c in preferred_countries]:
-                        filtered_servers.append(server)
-                else:
-                    filtered_servers.append(server)
+        # Normalize preferred countries once instead of per server
+        pref_upper = frozenset(c.upper() for c in preferred_countries) if preferred_countries else None
         
-        # Sort by score (higher is better), then by ping (lower is better)
-        filtered_servers.sort(key=lambda x: (-x['score'], x['ping']))
+        # Apply filters in one pass; servers must have config data and,
+        # if specified, be in one of the preferred countries
+        filtered_servers = [
+            server for server in servers
+            if (server.score >= min_score and
+                server.ping <= max_ping and
+                server.speed >= min_speed and
+                server.config_data and
+                (pref_upper is None or server.country_short.upper() in pref_upper))
+        ]
         
         logger.info(f"Filtered to {len(filtered_servers)} suitable servers")
-        return filtered_servers
+        
+        # Order by score (higher is better), then by ping (lower is better),
+        # selecting only the top_k servers instead of sorting them all
+        key = lambda x: (-x.score, x.ping)
+        if top_k is None:
+            return sorted(filtered_servers, key=key)
+        return heapq.nsmallest(top_k, filtered_servers, key=key)
+    
+    def resolve_servers(self, servers: List[Server]) -> List[Server]:
+        """
+        Resolve the remote hosts of the given servers concurrently.
+        
+        Resolvable servers are returned with their address in remote_ip;
+        servers whose host does not resolve are dropped.
+        
+        Args:
+            servers (List[Server]): Candidate servers
+            
+        Returns:
+            List[Server]: Resolvable servers, in their original order
+        """
+        def resolve(server: Server) -> Optional[Server]:
+            remote_host, remote_port = self._remote_endpoint(server)
+            try:
+                addrinfo = socket.getaddrinfo(remote_host, remote_port,
+                                              family=socket.AF_INET, type=socket.SOCK_STREAM)
+            except (socket.gaierror, UnicodeError) as e:
+                logger.debug(f"Could not resolve {remote_host}: {e}")
+                return None
+            return server._replace(remote_ip=addrinfo[0][4][0])
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            resolved = list(executor.map(resolve, servers))
+        
+        return [server for server in resolved if server is not None]
     
-    def create_ovpn_config(self, server: Dict[str, str], output_path: str) -> bool:
+    def create_ovpn_config(self, server: Server, output_path: str) -> bool:
         """
         Create OpenVPN configuration file from server data.
         
         Args:
-            server (Dict[str, str]): Server information
+            server (Server): Server information
             output_path (str): Path to save the config file
             
         Returns:
@@ -151,7 +353,7 @@ class VPNGateConnector:
         """
         try:
             # Decode base64 config data
-            config_data = base64.b64decode(server['config_data']).decode('utf-8')
+            config_data = _decode_config(server.config_data)
             
             # Write config to file
             with open(output_path, 'w') as f:
@@ -164,98 +366,218 @@ class VPNGateConnector:
             logger.error(f"Failed to create OpenVPN config: {e}")
             return False
     
-    def start_vpnclient_service(self) -> bool:
+    def start_vpnclient_service(self, process: Optional[subprocess.Popen] = None) -> bool:
         """
         Start the SoftEther VPN client service.
         
+        Args:
+            process (Optional[subprocess.Popen]): Already launched 'vpnclient start'
+                from launch_vpnclient_service, to wait on instead of starting a new one
+        
         Returns:
             bool: True if service started successfully, False otherwise
         """
-        logger.info("Starting SoftEther VPN client service...")
+        if process is None:
+            process = self.launch_vpnclient_service()
         
         try:
-            # Start the service
-            subprocess.run([str(self.vpnclient_path), "start"], check=True, capture_output=True)
+            # Wait for the start command itself
+            _, stderr = process.communicate(timeout=30)
+            if process.returncode != 0:
+                logger.error(f"Failed to start VPN client service: {stderr.decode(errors='replace').strip()}")
+                return False
             
-            # Wait a moment for service to initialize
-            time.sleep(3)
+            # Wait for the service to accept vpncmd connections
+            if not _wait_until(self._is_service_ready, timeout=10):
+                logger.error("VPN client service did not become ready")
+                return False
             
             logger.info("VPN client service started")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except subprocess.TimeoutExpired as e:
+            process.kill()
             logger.error(f"Failed to start VPN client service: {e}")
             return False
     
-    def create_virtual_adapter(self) -> bool:
+    def launch_vpnclient_service(self) -> subprocess.Popen:
+        """
+        Launch 'vpnclient start' without waiting for it.
+        
+        Returns:
+            subprocess.Popen: The running start command, to pass to start_vpnclient_service
+        """
+        logger.info("Starting SoftEther VPN client service...")
+        return subprocess.Popen([str(self.vpnclient_path), "start"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    
+    def stop_vpnclient_service(self, process: Optional[subprocess.Popen] = None) -> None:
+        """
+        Stop the SoftEther VPN client service.
+        
+        Args:
+            process (Optional[subprocess.Popen]): Pending 'vpnclient start' from
+                launch_vpnclient_service, reaped before the service is stopped
+        """
+        if process is not None:
+            try:
+                process.communicate(timeout=VPNCMD_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+        
+        try:
+            subprocess.run([str(self.vpnclient_path), "stop"], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=VPNCMD_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Failed to stop VPN client service: {e}")
+    
+    def _is_service_ready(self) -> bool:
+        """
+        Check if the VPN client service is accepting vpncmd connections.
+        
+        Returns:
+            bool: True if the service answered, False otherwise
+        """
+        try:
+            result = subprocess.run(self.vpncmd_base + ["AccountList"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                    timeout=VPNCMD_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return False
+        return result.returncode == 0
+    
+    def create_virtual_adapter(self, name: Optional[str] = None) -> bool:
         """
         Create a virtual network adapter for the VPN connection.
         
+        Args:
+            name (Optional[str]): Adapter name, defaults to the connection name
+            
         Returns:
             bool: True if adapter created successfully, False otherwise
         """
+        name = name or self.connection_name
         logger.info("Creating virtual network adapter...")
         
         try:
             # Create virtual adapter using vpncmd
-            cmd = [
-                str(self.vpncmd_path),
-                "localhost",
-                "/CLIENT",
-                "/CMD",
-                f"NicCreate {self.connection_name}"
-            ]
-            
-            subprocess.run(cmd, check=True, capture_output=True)
-            logger.info(f"Virtual adapter '{self.connection_name}' created")
+            cmd = self.vpncmd_base + [f"NicCreate {name}"]
+            
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=VPNCMD_TIMEOUT)
+            logger.info(f"Virtual adapter '{name}' created")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"Failed to create virtual adapter: {e}")
             return False
     
-    def create_vpn_connection(self, server: Dict[str, str]) -> bool:
+    def _remote_endpoint(self, server: Server) -> Tuple[str, str]:
+        """
+        Get the remote host and port from the server's OpenVPN config.
+        
+        Args:
+            server (Server): Server information
+            
+        Returns:
+            Tuple[str, str]: (remote_host, remote_port)
+        """
+        # Remote host and port were parsed from the OpenVPN config when fetched
+        # Use the pre-resolved address when available so SoftEther skips DNS
+        return server.remote_ip or server.remote_host or server.ip, server.remote_port
+    
+    def _account_create_args(self, server: Server, name: Optional[str] = None) -> List[str]:
+        """
+        Build the vpncmd AccountCreate command and parameters for a server.
+        
+        Args:
+            server (Server): Server information
+            name (Optional[str]): Account and adapter name, defaults to the connection name
+            
+        Returns:
+            List[str]: AccountCreate command followed by its parameters
+        """
+        name = name or self.connection_name
+        remote_host, remote_port = self._remote_endpoint(server)
+        return [
+            f"AccountCreate {name}",
+            f"/SERVER:{remote_host}:{remote_port}",
+            f"/HUB:{self.virtual_hub_name}",
+            "/USERNAME:vpn",
+            "/NICNAME:" + name
+        ]
+    
+    def _run_vpncmd_batch(self, commands: List[str]) -> Tuple[bool, str]:
+        """
+        Run several vpncmd commands in one vpncmd process through an /IN: script.
+        
+        Args:
+            commands (List[str]): vpncmd command lines, executed in order
+            
+        Returns:
+            Tuple[bool, str]: (all_commands_succeeded, vpncmd_output)
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', prefix='vpncmd_') as script:
+            script.write('\n'.join(commands) + '\n')
+            script.flush()
+            
+            try:
+                result = subprocess.run(
+                    [str(self.vpncmd_path), "localhost", "/CLIENT", f"/IN:{script.name}"],
+                    capture_output=True,
+                    text=True,
+                    timeout=VPNCMD_TIMEOUT
+                )
+            except subprocess.TimeoutExpired as e:
+                logger.error(f"vpncmd batch timed out: {e}")
+                return False, ''
+        
+        # vpncmd prints this marker once per command that succeeded
+        completed = result.stdout.count(VPNCMD_SUCCESS_MARKER)
+        return result.returncode == 0 and completed == len(commands), result.stdout
+    
+    def ensure_virtual_adapter(self, name: Optional[str] = None) -> bool:
+        """
+        Create the virtual network adapter unless it already exists.
+        
+        Args:
+            name (Optional[str]): Adapter name, defaults to the connection name
+            
+        Returns:
+            bool: True if the adapter exists or was created, False otherwise
+        """
+        name = name or self.connection_name
+        try:
+            result = subprocess.run(self.vpncmd_base + ["NicList"], capture_output=True,
+                                    text=True, timeout=VPNCMD_TIMEOUT)
+        except subprocess.TimeoutExpired as e:
+            logger.error(f"Failed to list virtual adapters: {e}")
+            return False
+        if result.returncode == 0 and name in NIC_NAME_RE.findall(result.stdout):
+            logger.info(f"Virtual adapter '{name}' already exists")
+            return True
+        
+        return self.create_virtual_adapter(name)
+    
+    def create_vpn_connection(self, server: Server) -> bool:
         """
         Create VPN connection configuration in SoftEther.
         
         Args:
-            server (Dict[str, str]): Server information
+            server (Server): Server information
             
         Returns:
             bool: True if connection created successfully, False otherwise
         """
-        logger.info(f"Creating VPN connection to {server['hostname']} ({server['country_short']})...")
+        logger.info(f"Creating VPN connection to {server.hostname} ({server.country_short})...")
         
         try:
-            # Extract connection details from OpenVPN config
-            config_data = base64.b64decode(server['config_data']).decode('utf-8')
-            
-            # Parse remote host and port from config
-            remote_host = server['ip']
-            remote_port = "1194"  # Default OpenVPN port
-            
-            for line in config_data.split('\n'):
-                if line.startswith('remote '):
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        remote_host = parts[1]
-                        remote_port = parts[2]
-                    break
-            
             # Create account using vpncmd
-            cmd = [
-                str(self.vpncmd_path),
-                "localhost",
-                "/CLIENT",
-                "/CMD",
-                f"AccountCreate {self.connection_name}",
-                f"/SERVER:{remote_host}:{remote_port}",
-                f"/HUB:{self.virtual_hub_name}",
-                "/USERNAME:vpn",
-                "/NICNAME:" + self.connection_name
-            ]
-            
-            subprocess.run(cmd, check=True, capture_output=True)
+            cmd = self.vpncmd_base + self._account_create_args(server)
+            
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=VPNCMD_TIMEOUT)
             logger.info(f"VPN connection '{self.connection_name}' created")
             return True
             
@@ -274,49 +596,38 @@ class VPNGateConnector:
         
         try:
             # Connect using vpncmd
-            cmd = [
-                str(self.vpncmd_path),
-                "localhost",
-                "/CLIENT",
-                "/CMD",
-                f"AccountConnect {self.connection_name}"
-            ]
+            cmd = self.vpncmd_base + [f"AccountConnect {self.connection_name}"]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=VPNCMD_TIMEOUT)
             
             # Wait for connection to establish
-            time.sleep(5)
-            
-            # Check connection status
-            if self.check_connection_status():
+            if _wait_until(self.check_connection_status, timeout=15):
                 logger.info("VPN connection established successfully")
                 return True
             else:
                 logger.error("VPN connection failed to establish")
                 return False
                 
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"Failed to connect to VPN: {e}")
             return False
     
-    def check_connection_status(self) -> bool:
+    def check_connection_status(self, name: Optional[str] = None) -> bool:
         """
         Check if VPN connection is active.
         
+        Args:
+            name (Optional[str]): Account name, defaults to the connection name
+            
         Returns:
             bool: True if connected, False otherwise
         """
         try:
             # Check account status
-            cmd = [
-                str(self.vpncmd_path),
-                "localhost",
-                "/CLIENT",
-                "/CMD",
-                f"AccountStatusGet {self.connection_name}"
-            ]
+            cmd = self.vpncmd_base + [f"AccountStatusGet {name or self.connection_name}"]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=VPNCMD_TIMEOUT)
             
             # Look for connection status indicators
             if "Connected" in result.stdout:
@@ -339,79 +650,156 @@ class VPNGateConnector:
         
         try:
             # Disconnect using vpncmd
-            cmd = [
-                str(self.vpncmd_path),
-                "localhost",
-                "/CLIENT",
-                "/CMD",
-                f"AccountDisconnect {self.connection_name}"
-            ]
-            
-            subprocess.run(cmd, check=True, capture_output=True)
+            cmd = self.vpncmd_base + [f"AccountDisconnect {self.connection_name}"]
+            
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=VPNCMD_TIMEOUT)
             logger.info("VPN disconnected successfully")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"Failed to disconnect VPN: {e}")
             return False
     
-    def connect_best_server(self, max_attempts: int = 3) -> Tuple[bool, Optional[Dict[str, str]]]:
+    def _try_server(self, server: Server, name: str, stop: threading.Event) -> bool:
+        """
+        Create an account for a server on its own adapter and try to connect.
+        
+        Args:
+            server (Server): Server information
+            name (str): Account and adapter name for this attempt
+            stop (threading.Event): Set once another attempt has connected
+            
+        Returns:
+            bool: True if the connection was established, False otherwise
+        """
+        logger.info(f"Trying server {server.hostname} ({server.country_short}) as '{name}'")
+        
+        try:
+            if not self.ensure_virtual_adapter(name):
+                return False
+            
+            # Create the VPN account and connect in one vpncmd run
+            success, output = self._run_vpncmd_batch([
+                " ".join(self._account_create_args(server, name)),
+                f"AccountConnect {name}"
+            ])
+            if not success:
+                logger.debug(f"vpncmd output:\n{output}")
+                return False
+            
+            # Wait for connection to establish, giving up as soon as another attempt wins
+            connected = _wait_until(lambda: stop.is_set() or self.check_connection_status(name),
+                                    timeout=15)
+            return connected and not stop.is_set()
+            
+        except Exception as e:
+            logger.error(f"Connection attempt failed: {e}")
+            return False
+    
+    def _remove_attempt(self, name: str) -> bool:
+        """
+        Delete the account and adapter created for a connection attempt.
+        
+        vpncmd stops an /IN: script at the first failing command, so each
+        command runs on its own. The disconnect is allowed to fail since the
+        account may never have connected.
+        
+        Args:
+            name (str): Account and adapter name of the attempt
+            
+        Returns:
+            bool: True if the account and adapter were deleted, False otherwise
+        """
+        self._run_vpncmd_batch([f"AccountDisconnect {name}"])
+        
+        removed = True
+        for command in (f"AccountDelete {name}", f"NicDelete {name}"):
+            success, output = self._run_vpncmd_batch([command])
+            if not success:
+                logger.warning(f"Cleanup command '{command}' failed")
+                logger.debug(f"vpncmd output:\n{output}")
+                removed = False
+        return removed
+    
+    def connect_best_server(self, max_attempts: int = 3,
+                            preferred_countries: Optional[List[str]] = None) -> Tuple[bool, Optional[Server]]:
         """
         Connect to the best available VPNGate server.
         
         Args:
             max_attempts (int): Maximum number of connection attempts
+            preferred_countries (Optional[List[str]]): List of preferred country codes
             
         Returns:
-            Tuple[bool, Optional[Dict[str, str]]]: (success_status, connected_server_info)
+            Tuple[bool, Optional[Server]]: (success_status, connected_server)
         """
         logger.info("Connecting to best available VPNGate server...")
         
+        # Start the VPN client service in the background while servers are fetched
+        vpnclient_start = self.launch_vpnclient_service()
+        
         # Fetch available servers
-        servers = self.fetch_vpngate_servers()
+        servers = self.fetch_vpngate_servers(preferred_countries)
         if not servers:
+            self.stop_vpnclient_service(vpnclient_start)
             return False, None
         
         # Filter servers
-        filtered_servers = self.filter_servers(servers)
+        filtered_servers = self.filter_servers(servers, top_k=max(max_attempts * 2, 10))
         if not filtered_servers:
             logger.error("No suitable servers found")
+            self.stop_vpnclient_service(vpnclient_start)
             return False, None
         
-        # Start VPN client service
-        if not self.start_vpnclient_service():
+        # Resolve the top candidates up front so DNS stays out of the connect attempts
+        filtered_servers = self.resolve_servers(filtered_servers[:max_attempts * 2])
+        if not filtered_servers:
+            logger.error("None of the top servers could be resolved")
+            self.stop_vpnclient_service(vpnclient_start)
             return False, None
         
-        # Try connecting to servers in order
-        for attempt in range(max_attempts):
-            # Select a server (try top servers first, then random)
-            if attempt < len(filtered_servers):
-                server = filtered_servers[attempt]
-            else:
-                server = random.choice(filtered_servers[:10])  # Random from top 10
-            
-            logger.info(f"Attempt {attempt + 1}: Trying server {server['hostname']} ({server['country_short']})")
-            
-            try:
-                # Create virtual adapter
-                self.create_virtual_adapter()
-                
-                # Create VPN connection
-                if self.create_vpn_connection(server):
-                    # Attempt to connect
-                    if self.connect_to_vpn():
-                        logger.info(f"Successfully connected to {server['hostname']} ({server['country_short']})")
-                        return True, server
-                
-                # If connection failed, clean up and try next server
-                self.disconnect_vpn()
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Connection attempt failed: {e}")
-                continue
+        # Wait for the VPN client service to come up
+        if not self.start_vpnclient_service(vpnclient_start):
+            self.stop_vpnclient_service()
+            return False, None
+        
+        # Pick the servers to try (top servers first, then random from top 10)
+        candidates = [
+            filtered_servers[attempt] if attempt < len(filtered_servers)
+            else random.choice(filtered_servers[:10])
+            for attempt in range(max_attempts)
+        ]
+        
+        # Race the attempts on separate accounts and adapters; the first to connect wins
+        names = [f"VPNGate_{i}" for i in range(len(candidates))]
+        winner = None
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=min(PARALLEL_ATTEMPTS, len(candidates))) as executor:
+            futures = {
+                executor.submit(self._try_server, server, name, stop): (server, name)
+                for server, name in zip(candidates, names)
+            }
+            for future in as_completed(futures):
+                if future.result():
+                    winner = futures[future]
+                    stop.set()
+                    for other in futures:
+                        other.cancel()
+                    break
+        
+        # Tear down every account and adapter except the winning one
+        for name in names:
+            if winner is None or name != winner[1]:
+                self._remove_attempt(name)
+        
+        if winner is not None:
+            server, self.connection_name = winner
+            logger.info(f"Successfully connected to {server.hostname} ({server.country_short})")
+            return True, server
         
         logger.error(f"Failed to connect after {max_attempts} attempts")
+        self.stop_vpnclient_service()
         return False, None
 
 
@@ -427,12 +815,13 @@ def connect_vpngate(softether_dir: str = "/opt/softether",
     Returns:
         Tuple[bool, Optional[str], Optional[Dict[str, str]]]: (success_status, error_message, server_info)
     """
+    connector = None
     try:
         connector = VPNGateConnector(softether_dir)
-        success, server = connector.connect_best_server()
+        success, server = connector.connect_best_server(preferred_countries=preferred_countries)
         
         if success:
-            return True, None, server
+            return True, None, server._asdict()
         else:
             return False, "Failed to connect to any VPNGate server", None
             
@@ -440,12 +829,18 @@ def connect_vpngate(softether_dir: str = "/opt/softether",
         error_msg = f"Unexpected error during VPN connection: {str(e)}"
         logger.error(error_msg)
         return False, error_msg, None
+    
+    finally:
+        if connector is not None:
+            connector.close()
 
 
 if __name__ == "__main__":
     """
     Direct execution for testing the VPNGate connector.
     """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     success, error = connect_vpngate()
     if success:
         print("Successfully connected to VPNGate!")
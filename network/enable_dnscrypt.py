@@ -10,178 +10,64 @@ security by encrypting DNS queries.
 import os
 import subprocess
 import logging
+import functools
 import json
+import base64
+import hashlib
 import urllib.request
-import tarfile
 import shutil
+import stat
 import time
+import string
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    import dns.resolver
+except ImportError:
+    dns = None
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+except ImportError:
+    Ed25519PublicKey = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Buffer size for streaming the release archive
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 
-class DNSCryptConfigurator:
-    """
-    Handles DNSCrypt-proxy installation and configuration for encrypted DNS.
-    
-    This class manages downloading, installing, and configuring DNSCrypt-proxy
-    to provide encrypted DNS resolution with various privacy-focused resolvers.
-    """
-    
-    def __init__(self, install_dir: str = "/opt/dnscrypt-proxy"):
-        """
-        Initialize the DNSCrypt configurator.
-        
-        Args:
-            install_dir (str): Directory where DNSCrypt-proxy will be installed
-        """
-        self.install_dir = Path(install_dir)
-        self.config_dir = self.install_dir / "config"
-        self.binary_path = self.install_dir / "dnscrypt-proxy"
-        self.config_file = self.config_dir / "dnscrypt-proxy.toml"
-        self.service_file = Path("/etc/systemd/system/dnscrypt-proxy.service")
-        
-        # DNSCrypt-proxy download URL (GitHub releases)
-        self.download_base_url = "https://github.com/DNSCrypt/dnscrypt-proxy/releases/latest/download"
-        self.archive_name = "dnscrypt-proxy-linux_x86_64.tar.gz"
-        
-        # Default secure resolvers
-        self.default_resolvers = [
-            "cloudflare",
-            "cloudflare-ipv6",
-            "quad9-dnscrypt-ip4-nofilter-pri",
-            "adguard-dns-doh",
-        ]
-    
-    def check_dependencies(self) -> bool:
-        """
-        Check if required system dependencies are available.
-        
-        Returns:
-            bool: True if all dependencies are available, False otherwise
-        """
-        logger.info("Checking DNSCrypt dependencies...")
-        
-        required_commands = ["wget", "tar", "systemctl"]
-        missing_commands = []
-        
-        for cmd in required_commands:
-            if not shutil.which(cmd):
-                missing_commands.append(cmd)
-        
-        if missing_commands:
-            logger.error(f"Missing required commands: {', '.join(missing_commands)}")
-            return False
-        
-        logger.info("All DNSCrypt dependencies are available")
-        return True
-    
-    def download_dnscrypt(self) -> bool:
-        """
-        Download DNSCrypt-proxy binary package.
-        
-        Returns:
-            bool: True if download successful, False otherwise
-        """
-        logger.info("Downloading DNSCrypt-proxy...")
-        
-        try:
-            download_url = f"{self.download_base_url}/{self.archive_name}"
-            download_path = Path("/tmp") / self.archive_name
-            
-            # Download the archive
-            urllib.request.urlretrieve(download_url, download_path)
-            
-            logger.info(f"Downloaded DNSCrypt-proxy to {download_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to download DNSCrypt-proxy: {e}")
-            return False
-    
-    def extract_and_install(self) -> bool:
-        """
-        Extract DNSCrypt-proxy and install to target directory.
-        
-        Returns:
-            bool: True if installation successful, False otherwise
-        """
-        logger.info("Extracting and installing DNSCrypt-proxy...")
-        
-        try:
-            download_path = Path("/tmp") / self.archive_name
-            extract_dir = Path("/tmp/dnscrypt-extract")
-            
-            # Create extraction directory
-            extract_dir.mkdir(exist_ok=True)
-            
-            # Extract the archive
-            with tarfile.open(download_path, "r:gz") as tar:
-                tar.extractall(extract_dir)
-            
-            # Find the extracted directory
-            extracted_dirs = [d for d in extract_dir.iterdir() if d.is_dir()]
-            if not extracted_dirs:
-                logger.error("No directory found in extracted archive")
-                return False
-            
-            source_dir = extracted_dirs[0]
-            
-            # Create install directory
-            self.install_dir.mkdir(parents=True, exist_ok=True)
-            self.config_dir.mkdir(exist_ok=True)
-            
-            # Copy binary
-            binary_source = source_dir / "dnscrypt-proxy"
-            if binary_source.exists():
-                shutil.copy2(binary_source, self.binary_path)
-                os.chmod(self.binary_path, 0o755)
-                logger.info(f"Installed DNSCrypt-proxy binary to {self.binary_path}")
-            else:
-                logger.error("DNSCrypt-proxy binary not found in archive")
-                return False
-            
-            # Copy example configuration if available
-            config_source = source_dir / "example-dnscrypt-proxy.toml"
-            if config_source.exists():
-                shutil.copy2(config_source, self.config_dir / "example-dnscrypt-proxy.toml")
-                logger.info("Copied example configuration")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to extract and install DNSCrypt-proxy: {e}")
-            return False
-    
-    def create_configuration(self, 
-                           listen_addresses: List[str] = None,
-                           resolvers: List[str] = None,
-                           enable_logging: bool = True) -> bool:
-        """
-        Create DNSCrypt-proxy configuration file.
-        
-        Args:
-            listen_addresses (List[str]): Addresses to listen on
-            resolvers (List[str]): List of resolver names to use
-            enable_logging (bool): Whether to enable logging
-            
-        Returns:
-            bool: True if configuration created successfully, False otherwise
-        """
-        logger.info("Creating DNSCrypt-proxy configuration...")
-        
-        try:
-            if listen_addresses is None:
-                listen_addresses = ["127.0.0.1:53", "[::1]:53"]
-            
-            if resolvers is None:
-                resolvers = self.default_resolvers
-            
-            # Create configuration content
-            config_content = f"""##############################################
+# minisign public key that signs dnscrypt-proxy releases
+MINISIGN_PUBLIC_KEY = "RWTk1xXqcTODeYttYMCMLo0YJHaFEHn7a3akqHlb/7QvIQXHVPxKbjB5"
+
+# Back-off between is-active checks after starting the service (~6.5 s total)
+START_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8, 1.0, 1.0, 1.0, 1.0, 1.0)
+
+# Commands that must be installed for DNSCrypt setup
+REQUIRED_COMMANDS = ("wget", "tar", "systemctl")
+
+# GitHub release metadata, cached on disk so version checks stay offline
+LATEST_RELEASE_URL = "https://api.github.com/repos/DNSCrypt/dnscrypt-proxy/releases/latest"
+LATEST_RELEASE_CACHE = Path("/var/cache/connections_script/dnscrypt-latest.json")
+LATEST_RELEASE_TTL = 24 * 60 * 60
+
+# systemctl show properties reported by get_service_status
+SERVICE_STATUS_PROPERTIES = {
+    'ActiveState': 'active',
+    'UnitFileState': 'enabled',
+    'ActiveEnterTimestamp': 'uptime',
+}
+
+# dnscrypt-proxy.toml template, filled in by create_configuration
+CONFIG_TEMPLATE = string.Template("""##############################################
 #                                          #
 #        DNSCrypt-proxy configuration      #
 #                                          #
@@ -192,10 +78,10 @@ class DNSCryptConfigurator:
 ##################################
 
 # List of servers to use
-server_names = {json.dumps(resolvers)}
+server_names = $server_names
 
 # List of local addresses and ports to listen to
-listen_addresses = {json.dumps(listen_addresses)}
+listen_addresses = $listen_addresses
 
 # Maximum number of simultaneous client connections to accept
 max_clients = 250
@@ -239,10 +125,10 @@ lb_estimator = true
 ##################################
 
 # Log level (0-6, default: 2 - 0 is very verbose, 6 only contains fatal errors)
-log_level = {"2" if enable_logging else "6"}
+log_level = $log_level
 
 # log file for the application
-log_file = '{self.config_dir / "dnscrypt-proxy.log"}' if enable_logging else ''
+log_file = '$log_file' if enable_logging else ''
 
 # Use the system logger (syslog on Unix, Event Log on Windows)
 use_syslog = false
@@ -330,14 +216,14 @@ cert_key_file = ""
 
   [sources.'public-resolvers']
   urls = ['https://raw.githubusercontent.com/DNSCrypt/dnscrypt-resolvers/master/v3/public-resolvers.md', 'https://download.dnscrypt.info/resolvers-list/v3/public-resolvers.md']
-  cache_file = '{self.config_dir / "public-resolvers.md"}'
+  cache_file = '$public_resolvers_cache'
   minisign_key = 'RWQf6LRCGA9i53mlYecO4IzT51TGPpvWucNSCh1CBM0QTaLn73Y7GFO3'
   refresh_delay = 72
   prefix = ''
 
   [sources.'relays']
   urls = ['https://raw.githubusercontent.com/DNSCrypt/dnscrypt-resolvers/master/v3/relays.md', 'https://download.dnscrypt.info/resolvers-list/v3/relays.md']
-  cache_file = '{self.config_dir / "relays.md"}'
+  cache_file = '$relays_cache'
   minisign_key = 'RWQf6LRCGA9i53mlYecO4IzT51TGPpvWucNSCh1CBM0QTaLn73Y7GFO3'
   refresh_delay = 72
   prefix = ''
@@ -354,11 +240,369 @@ cert_key_file = ""
 
 # List of servers to avoid, with the reason they were broken
 # fragments_blocked = ['cisco', 'cisco-ipv6', 'cisco-familyshield', 'cisco-familyshield-ipv6', 'cleanbrowsing-adult', 'cleanbrowsing-adult-ipv6', 'cleanbrowsing-family', 'cleanbrowsing-family-ipv6', 'cleanbrowsing-security', 'cleanbrowsing-security-ipv6']
-"""
+""")
+
+
+@functools.lru_cache(maxsize=1)
+def _path_binaries() -> frozenset:
+    """
+    Collect the names of all executable files in the directories on $PATH.
+    
+    Returns:
+        frozenset: Executable file names found on $PATH
+    """
+    names = set()
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        try:
+            with os.scandir(directory or '.') as entries:
+                names.update(entry.name for entry in entries
+                             if entry.is_file() and os.access(entry.path, os.X_OK))
+        except OSError:
+            continue
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=1)
+def _missing_dependencies() -> Tuple[str, ...]:
+    """
+    Find the required DNSCrypt commands that are not on $PATH.
+    
+    Cached so repeated configurator instances share a single check.
+    
+    Returns:
+        Tuple[str, ...]: Names of the missing commands
+    """
+    path_binaries = _path_binaries()
+    return tuple(cmd for cmd in REQUIRED_COMMANDS if cmd not in path_binaries)
+
+
+def _json_dumps(value) -> str:
+    """
+    Encode a value as compact JSON, using orjson when it is installed.
+    
+    Args:
+        value: JSON-serialisable value
+        
+    Returns:
+        str: Compact JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _fetch_minisig(url: str) -> bytes:
+    """
+    Download a minisign signature file.
+    
+    Args:
+        url (str): URL of the .minisig file
+        
+    Returns:
+        bytes: Signature file contents
+    """
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def _verify_minisig(digest: bytes, minisig: bytes) -> bool:
+    """
+    Check a BLAKE2b-512 file digest against a prehashed minisign signature.
+    
+    Args:
+        digest (bytes): BLAKE2b-512 digest of the signed file
+        minisig (bytes): Contents of the .minisig file
+        
+    Returns:
+        bool: True if the signature is valid, False otherwise
+    """
+    if Ed25519PublicKey is None:
+        logger.error("cryptography is not installed, cannot verify the DNSCrypt-proxy signature")
+        return False
+    
+    try:
+        signature_blob = base64.b64decode(minisig.splitlines()[1])
+        public_key = base64.b64decode(MINISIGN_PUBLIC_KEY)
+    except Exception as e:
+        logger.error(f"Malformed DNSCrypt-proxy signature: {e}")
+        return False
+    
+    algorithm, key_id, signature = signature_blob[:2], signature_blob[2:10], signature_blob[10:74]
+    if algorithm != b'ED':
+        logger.error("DNSCrypt-proxy signature is not a prehashed (ED) minisign signature")
+        return False
+    if key_id != public_key[2:10]:
+        logger.error("DNSCrypt-proxy signature was made with an unexpected key")
+        return False
+    
+    try:
+        Ed25519PublicKey.from_public_bytes(public_key[10:42]).verify(signature, digest)
+    except InvalidSignature:
+        return False
+    
+    logger.info("DNSCrypt-proxy signature verified")
+    return True
+
+
+def _is_private(st: os.stat_result) -> bool:
+    """
+    Check that a file is owned by the current user and not writable by others.
+    
+    Args:
+        st (os.stat_result): Result of stat on the file
+        
+    Returns:
+        bool: True if only the current user can have written the file
+    """
+    return st.st_uid == os.geteuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _read_release_cache() -> Optional[bytes]:
+    """
+    Read the cached release metadata if it is fresh and trustworthy.
+    
+    The cache is opened without following symlinks and ignored unless it
+    and its directory belong to the current user and are not writable by
+    anyone else.
+    
+    Returns:
+        Optional[bytes]: Cached release JSON, or None if it cannot be used
+    """
+    cache = LATEST_RELEASE_CACHE
+    try:
+        if not _is_private(os.lstat(cache.parent)):
+            return None
+        fd = os.open(cache, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    
+    with os.fdopen(fd, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if (not stat.S_ISREG(st.st_mode) or not _is_private(st)
+                or time.time() - st.st_mtime >= LATEST_RELEASE_TTL):
+            return None
+        return f.read()
+
+
+def _write_release_cache(body: bytes) -> None:
+    """
+    Atomically replace the cached release metadata.
+    
+    Args:
+        body (bytes): Release JSON returned by the GitHub API
+    """
+    cache_dir = LATEST_RELEASE_CACHE.parent
+    cache_dir.mkdir(mode=0o755, parents=True, exist_ok=True)
+    st = os.lstat(cache_dir)
+    if not stat.S_ISDIR(st.st_mode) or not _is_private(st):
+        raise PermissionError(f"Refusing to write to untrusted cache directory {cache_dir}")
+    
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{LATEST_RELEASE_CACHE.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, LATEST_RELEASE_CACHE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class DNSCryptConfigurator:
+    """
+    Handles DNSCrypt-proxy installation and configuration for encrypted DNS.
+    
+    This class manages downloading, installing, and configuring DNSCrypt-proxy
+    to provide encrypted DNS resolution with various privacy-focused resolvers.
+    """
+    
+    def __init__(self, install_dir: str = "/opt/dnscrypt-proxy"):
+        """
+        Initialize the DNSCrypt configurator.
+        
+        Args:
+            install_dir (str): Directory where DNSCrypt-proxy will be installed
+        """
+        self.install_dir = Path(install_dir)
+        self.config_dir = self.install_dir / "config"
+        self.binary_path = self.install_dir / "dnscrypt-proxy"
+        self.config_file = self.config_dir / "dnscrypt-proxy.toml"
+        self.service_file = Path("/etc/systemd/system/dnscrypt-proxy.service")
+        
+        # DNSCrypt-proxy download URL (GitHub releases)
+        self.download_base_url = "https://github.com/DNSCrypt/dnscrypt-proxy/releases/latest/download"
+        self.archive_name = "dnscrypt-proxy-linux_x86_64.tar.gz"
+        
+        # Default secure resolvers
+        self.default_resolvers = [
+            "cloudflare",
+            "cloudflare-ipv6",
+            "quad9-dnscrypt-ip4-nofilter-pri",
+            "adguard-dns-doh",
+        ]
+    
+    def check_dependencies(self) -> bool:
+        """
+        Check if required system dependencies are available.
+        
+        Returns:
+            bool: True if all dependencies are available, False otherwise
+        """
+        logger.info("Checking DNSCrypt dependencies...")
+        
+        missing_commands = _missing_dependencies()
+        
+        if missing_commands:
+            logger.error(f"Missing required commands: {', '.join(missing_commands)}")
+            return False
+        
+        logger.info("All DNSCrypt dependencies are available")
+        return True
+    
+    def fetch_and_install(self) -> bool:
+        """
+        Download DNSCrypt-proxy and install it to the target directory.
+        
+        The archive is spooled to an anonymous temporary file and hashed on
+        the way, and only handed to tar once it has been checked against
+        the release's minisign signature.
+        
+        Returns:
+            bool: True if installation successful, False otherwise
+        """
+        logger.info("Downloading and installing DNSCrypt-proxy...")
+        
+        if Ed25519PublicKey is None:
+            logger.error("cryptography is required to verify the DNSCrypt-proxy release")
+            return False
+        
+        try:
+            download_url = f"{self.download_base_url}/{self.archive_name}"
+            extract_dir = Path("/tmp/dnscrypt-extract")
+            
+            # Create extraction directory
+            extract_dir.mkdir(exist_ok=True)
+            
+            with tempfile.TemporaryFile() as archive:
+                # Fetch the release signature while the archive downloads
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    signature_future = executor.submit(_fetch_minisig, f"{download_url}.minisig")
+                    
+                    # Spool the archive, hashing it on the way for the signature
+                    # check; it is already gzipped, so ask the server not to
+                    # compress it again
+                    digest = hashlib.blake2b()
+                    request = urllib.request.Request(download_url, headers={"Accept-Encoding": "identity"})
+                    with urllib.request.urlopen(request) as response:
+                        for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b''):
+                            digest.update(chunk)
+                            archive.write(chunk)
+                    
+                    minisig = signature_future.result()
+                
+                # Refuse to extract anything from an archive that fails verification
+                if not _verify_minisig(digest.digest(), minisig):
+                    logger.error("DNSCrypt-proxy archive failed signature verification")
+                    return False
+                
+                archive.flush()
+                archive.seek(0)
+                result = subprocess.run(
+                    # Ignore archived owners, modes and mtimes, like tarfile's 'data' filter
+                    ["tar", "--no-same-owner", "--no-same-permissions", "--touch",
+                     "-xzf", "-", "-C", str(extract_dir)],
+                    stdin=archive,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
+                )
+            
+            if result.returncode != 0:
+                logger.error(f"tar failed to extract DNSCrypt-proxy: {result.stderr.decode(errors='replace').strip()}")
+                return False
+            
+            logger.info(f"Downloaded and extracted DNSCrypt-proxy to {extract_dir}")
+            
+            # Find the extracted directory
+            with os.scandir(extract_dir) as entries:
+                extracted_dirs = [Path(e.path) for e in entries if e.is_dir(follow_symlinks=False)]
+            if not extracted_dirs:
+                logger.error("No directory found in extracted archive")
+                return False
+            
+            source_dir = extracted_dirs[0]
+            
+            # Create install directory
+            self.install_dir.mkdir(parents=True, exist_ok=True)
+            self.config_dir.mkdir(exist_ok=True)
+            
+            # Copy binary
+            binary_source = source_dir / "dnscrypt-proxy"
+            if binary_source.exists():
+                # Copy in-kernel rather than through Python buffers
+                with open(binary_source, 'rb') as src, open(self.binary_path, 'wb') as dst:
+                    size = os.fstat(src.fileno()).st_size
+                    offset = 0
+                    while offset < size:
+                        copied = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                        if not copied:
+                            # The source shrank underneath us; don't install a truncated binary
+                            raise OSError(f"Unexpected end of {binary_source} at byte {offset}")
+                        offset += copied
+                shutil.copystat(binary_source, self.binary_path)
+                os.chmod(self.binary_path, 0o755)
+                logger.info(f"Installed DNSCrypt-proxy binary to {self.binary_path}")
+            else:
+                logger.error("DNSCrypt-proxy binary not found in archive")
+                return False
+            
+            # Copy example configuration if available
+            config_source = source_dir / "example-dnscrypt-proxy.toml"
+            if config_source.exists():
+                shutil.copy2(config_source, self.config_dir / "example-dnscrypt-proxy.toml")
+                logger.info("Copied example configuration")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to download and install DNSCrypt-proxy: {e}")
+            return False
+    
+    def create_configuration(self, 
+                           listen_addresses: List[str] = None,
+                           resolvers: List[str] = None,
+                           enable_logging: bool = True) -> bool:
+        """
+        Create DNSCrypt-proxy configuration file.
+        
+        Args:
+            listen_addresses (List[str]): Addresses to listen on
+            resolvers (List[str]): List of resolver names to use
+            enable_logging (bool): Whether to enable logging
+            
+        Returns:
+            bool: True if configuration created successfully, False otherwise
+        """
+        logger.info("Creating DNSCrypt-proxy configuration...")
+        
+        try:
+            if listen_addresses is None:
+                listen_addresses = ["127.0.0.1:53", "[::1]:53"]
+            
+            if resolvers is None:
+                resolvers = self.default_resolvers
+            
+            # Fill in the configuration template
+            config_content = CONFIG_TEMPLATE.substitute(
+                server_names=_json_dumps(resolvers),
+                listen_addresses=_json_dumps(listen_addresses),
+                log_level="2" if enable_logging else "6",
+                log_file=self.config_dir / "dnscrypt-proxy.log",
+                public_resolvers_cache=self.config_dir / "public-resolvers.md",
+                relays_cache=self.config_dir / "relays.md",
+            )
             
             # Write configuration file
-            with open(self.config_file, 'w') as f:
-                f.write(config_content)
+            self.config_file.write_bytes(config_content.encode('utf-8'))
             
             logger.info(f"DNSCrypt-proxy configuration created at {self.config_file}")
             return True
@@ -405,14 +649,17 @@ WantedBy=multi-user.target
 """
             
             # Write service file
-            with open(self.service_file, 'w') as f:
-                f.write(service_content)
-            
-            # Reload systemd and enable service
-            subprocess.run(["systemctl", "daemon-reload"], check=True)
-            subprocess.run(["systemctl", "enable", "dnscrypt-proxy"], check=True)
+            self.service_file.write_bytes(service_content.encode('utf-8'))
+            
+            # Reload systemd; the unit is enabled when it is started
+            subprocess.run(
+                ["systemctl", "daemon-reload"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
             
-            logger.info("DNSCrypt-proxy systemd service created and enabled")
+            logger.info("DNSCrypt-proxy systemd service created")
             return True
             
         except Exception as e:
@@ -421,7 +668,7 @@ WantedBy=multi-user.target
     
     def start_dnscrypt_service(self) -> bool:
         """
-        Start the DNSCrypt-proxy service.
+        Enable and start the DNSCrypt-proxy service.
         
         Returns:
             bool: True if service started successfully, False otherwise
@@ -429,25 +676,31 @@ WantedBy=multi-user.target
         logger.info("Starting DNSCrypt-proxy service...")
         
         try:
-            # Start the service
-            subprocess.run(["systemctl", "start", "dnscrypt-proxy"], check=True)
-            
-            # Wait a moment for service to initialize
-            time.sleep(3)
-            
-            # Check if service is running
-            result = subprocess.run(
-                ["systemctl", "is-active", "dnscrypt-proxy"],
-                capture_output=True,
-                text=True
+            # Enable and start the service in one call; systemctl waits for
+            # the start job to finish before returning
+            subprocess.run(
+                ["systemctl", "enable", "--now", "dnscrypt-proxy"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
-            if result.returncode == 0 and "active" in result.stdout:
-                logger.info("DNSCrypt-proxy service started successfully")
-                return True
-            else:
-                logger.error("DNSCrypt-proxy service failed to start")
-                return False
+            # Poll until the service reports active, backing off between checks
+            for delay in START_POLL_DELAYS:
+                result = subprocess.run(
+                    ["systemctl", "is-active", "dnscrypt-proxy"],
+                    capture_output=True,
+                    text=True
+                )
+                
+                if result.returncode == 0 and result.stdout.strip() == "active":
+                    logger.info("DNSCrypt-proxy service started successfully")
+                    return True
+                
+                time.sleep(delay)
+            
+            logger.error("DNSCrypt-proxy service failed to start")
+            return False
                 
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to start DNSCrypt-proxy service: {e}")
@@ -463,7 +716,12 @@ WantedBy=multi-user.target
         logger.info("Stopping DNSCrypt-proxy service...")
         
         try:
-            subprocess.run(["systemctl", "stop", "dnscrypt-proxy"], check=True)
+            subprocess.run(
+                ["systemctl", "stop", "dnscrypt-proxy"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
             logger.info("DNSCrypt-proxy service stopped")
             return True
             
@@ -482,32 +740,61 @@ WantedBy=multi-user.target
         
         test_domains = ["example.com", "cloudflare.com", "google.com"]
         
-        for domain in test_domains:
-            try:
-                # Test DNS resolution using dig with specific server
-                result = subprocess.run(
-                    ["dig", "+short", f"@127.0.0.1", domain, "A"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    logger.info(f"DNSCrypt resolution test passed for {domain}")
-                else:
-                    logger.error(f"DNSCrypt resolution test failed for {domain}")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                logger.error(f"DNSCrypt resolution test timed out for {domain}")
-                return False
-            except Exception as e:
-                logger.error(f"DNSCrypt resolution test error for {domain}: {e}")
-                return False
+        # The lookups are independent, so run them all at once
+        with ThreadPoolExecutor(max_workers=len(test_domains)) as executor:
+            results = list(executor.map(self._resolve_one, test_domains))
+        
+        if not all(results):
+            return False
         
         logger.info("All DNSCrypt resolution tests passed")
         return True
     
+    def _resolve_one(self, domain: str) -> bool:
+        """
+        Resolve a single domain through DNSCrypt-proxy.
+        
+        Queries 127.0.0.1 in-process with dnspython when available and
+        falls back to dig otherwise.
+        
+        Args:
+            domain (str): Domain name to resolve
+            
+        Returns:
+            bool: True if the domain resolved, False otherwise
+        """
+        try:
+            if dns is not None:
+                resolver = dns.resolver.Resolver(configure=False)
+                resolver.nameservers = ["127.0.0.1"]
+                resolver.timeout = 2
+                resolver.lifetime = 5
+                resolver.resolve(domain, "A")
+                logger.info(f"DNSCrypt resolution test passed for {domain}")
+                return True
+            
+            # Test DNS resolution using dig with specific server
+            result = subprocess.run(
+                ["dig", "+short", f"@127.0.0.1", domain, "A"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            
+            if result.returncode == 0 and result.stdout.strip():
+                logger.info(f"DNSCrypt resolution test passed for {domain}")
+                return True
+            
+            logger.error(f"DNSCrypt resolution test failed for {domain}")
+            return False
+            
+        except subprocess.TimeoutExpired:
+            logger.error(f"DNSCrypt resolution test timed out for {domain}")
+            return False
+        except Exception as e:
+            logger.error(f"DNSCrypt resolution test error for {domain}: {e}")
+            return False
+    
     def get_service_status(self) -> Dict[str, str]:
         """
         Get DNSCrypt-proxy service status information.
@@ -522,39 +809,62 @@ WantedBy=multi-user.target
         }
         
         try:
-            # Check if service is active
+            # Query all properties with a single systemctl call
             result = subprocess.run(
-                ["systemctl", "is-active", "dnscrypt-proxy"],
+                ["systemctl", "show", "dnscrypt-proxy",
+                 "--property=ActiveState,UnitFileState,ActiveEnterTimestamp"],
                 capture_output=True,
                 text=True
             )
-            status_info['active'] = result.stdout.strip()
             
-            # Check if service is enabled
-            result = subprocess.run(
-                ["systemctl", "is-enabled", "dnscrypt-proxy"],
-                capture_output=True,
-                text=True
-            )
-            status_info['enabled'] = result.stdout.strip()
+            for line in result.stdout.splitlines():
+                key, _, value = line.partition('=')
+                if key in SERVICE_STATUS_PROPERTIES and value:
+                    status_info[SERVICE_STATUS_PROPERTIES[key]] = value
+            
+        except Exception as e:
+            logger.error(f"Failed to get service status: {e}")
+        
+        return status_info
+    
+    def _is_latest_version(self) -> bool:
+        """
+        Check whether the installed binary matches the latest GitHub release.
+        
+        The release metadata is cached in LATEST_RELEASE_CACHE for 24 hours.
+        
+        Returns:
+            bool: True if the installed binary is up to date, False otherwise
+        """
+        try:
+            body = _read_release_cache()
+            if body is None:
+                request = urllib.request.Request(
+                    LATEST_RELEASE_URL, headers={"Accept": "application/vnd.github+json"}
+                )
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    body = response.read()
+                try:
+                    _write_release_cache(body)
+                except OSError as e:
+                    logger.warning(f"Could not cache DNSCrypt-proxy release metadata: {e}")
+            release = json.loads(body)
+            
+            latest = release.get('tag_name', '').lstrip('v')
             
-            # Get service status with uptime
             result = subprocess.run(
-                ["systemctl", "status", "dnscrypt-proxy", "--no-pager"],
+                [str(self.binary_path), "-version"],
                 capture_output=True,
-                text=True
+                text=True,
+                timeout=10
             )
+            installed = result.stdout.strip().lstrip('v')
             
-            # Extract uptime information
-            for line in result.stdout.split('\n'):
-                if 'Active:' in line:
-                    status_info['uptime'] = line.strip()
-                    break
+            return result.returncode == 0 and bool(latest) and installed == latest
             
         except Exception as e:
-            logger.error(f"Failed to get service status: {e}")
-        
-        return status_info
+            logger.warning(f"Could not check DNSCrypt-proxy version: {e}")
+            return False
     
     def install_and_configure(self, 
                             resolvers: Optional[List[str]] = None,
@@ -582,12 +892,10 @@ WantedBy=multi-user.target
         if not self.check_dependencies():
             return False
         
-        # Download DNSCrypt-proxy
-        if not self.download_dnscrypt():
-            return False
-        
-        # Extract and install
-        if not self.extract_and_install():
+        # Download, extract and install unless the binary is already current
+        if self.binary_path.exists() and self._is_latest_version():
+            logger.info("DNSCrypt-proxy binary is up to date, skipping download")
+        elif not self.fetch_and_install():
             return False
         
         # Create configuration
@@ -658,6 +966,8 @@ if __name__ == "__main__":
     """
     Direct execution for testing the DNSCrypt configurator.
     """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     print("Installing and configuring DNSCrypt-proxy...")
     success, error = enable_dnscrypt()
     if success:
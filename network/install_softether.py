@@ -7,19 +7,338 @@ on a Linux-based Docker container. It downloads, compiles, and configures
 the SoftEther VPN client for use with VPNGate servers.
 """
 
+import io
+import errno
+import hashlib
 import os
+import sys
 import subprocess
 import logging
+import functools
 import tarfile
+import urllib.error
 import urllib.request
 import shutil
+import tempfile
+import threading
+import time
+import mmap
+import platform
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+try:
+    from pystemd.systemd1 import Manager
+except ImportError:
+    Manager = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Read-ahead buffer wrapped around the download response
+DOWNLOAD_BUFFER_SIZE = 256 * 1024
+
+# Let subprocess use posix_spawn instead of fork; 3.13+ does so by default
+SPAWN_OPTIONS = {'close_fds': False} if sys.version_info < (3, 13) else {}
+
+# apt packages installed for the build, mapped to a command each one provides
+DEPENDENCY_PACKAGES = {
+    "gcc": "gcc",
+    "make": "make",
+    "wget": "wget",
+    "tar": "tar",
+    "build-essential": "g++",
+}
+
+# apt package lists younger than this are not refreshed before installing
+APT_PKGCACHE = Path("/var/cache/apt/pkgcache.bin")
+APT_CACHE_TTL = 24 * 60 * 60
+
+# Safe extraction filter where tarfile supports it (3.12, backported to 3.8.17+)
+EXTRACT_OPTIONS = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+# Parallel connections used when downloading the archive to disk
+DOWNLOAD_CONNECTIONS = 8
+
+
+@functools.lru_cache(maxsize=1)
+def _path_executables() -> Dict[str, str]:
+    """
+    Map command names to their full paths with one scan of each $PATH directory.
+    
+    Like shutil.which, earlier $PATH entries win. Cleared after packages are
+    installed so new commands are picked up.
+    
+    Returns:
+        Dict[str, str]: Command name to full path
+    """
+    executables = {}
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    if (entry.name not in executables and entry.is_file()
+                            and os.access(entry.path, os.X_OK)):
+                        executables[entry.name] = entry.path
+        except OSError:
+            continue
+    return executables
+
+
+def _which(command: str) -> Optional[str]:
+    """
+    Look up a command in the cached $PATH scan.
+    
+    Args:
+        command (str): Command name
+        
+    Returns:
+        Optional[str]: Full path of the command, or None if not found
+    """
+    return _path_executables().get(command)
+
+
+def _run(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a command with subprocess.run on CPython's posix_spawn fast path.
+    
+    Before Python 3.13 posix_spawn is only used when close_fds is False and
+    the executable is given with a directory, otherwise CPython forks and
+    copies the interpreter's page tables for every child.
+    
+    Args:
+        cmd (List[str]): Command and arguments
+        **kwargs: Extra keyword arguments for subprocess.run
+        
+    Returns:
+        subprocess.CompletedProcess: Result of the command
+    """
+    executable = _which(cmd[0]) or cmd[0]
+    return subprocess.run([executable, *cmd[1:]], **SPAWN_OPTIONS, **kwargs)
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """
+    Copy a file in-kernel and carry over its mode and timestamps.
+    
+    Uses copy_file_range where the kernel supports it between the two
+    filesystems and sendfile otherwise, so data never passes through
+    Python buffers.
+    
+    Args:
+        src (Path): Source file
+        dst (Path): Destination file
+    """
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        st = os.fstat(s.fileno())
+        offset = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while offset < st.st_size:
+                    copied = os.copy_file_range(s.fileno(), d.fileno(), st.st_size - offset, offset, offset)
+                    if not copied:
+                        break
+                    offset += copied
+            except OSError as e:
+                # Older kernels refuse cross-filesystem copies; sendfile picks up
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        while offset < st.st_size:
+            copied = os.sendfile(d.fileno(), s.fileno(), offset, st.st_size - offset)
+            if not copied:
+                break
+            offset += copied
+    os.chmod(dst, st.st_mode & 0o7777)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _extract_members(tar: tarfile.TarFile, extract_dir: Path) -> Optional[str]:
+    """
+    Extract every member of a streaming tar archive.
+    
+    Args:
+        tar (tarfile.TarFile): Archive opened in a streaming mode
+        extract_dir (Path): Directory to extract into
+        
+    Returns:
+        Optional[str]: First top-level vpnclient directory seen, if any
+    """
+    vpnclient_root = None
+    for member in tar:
+        name = member.name[2:] if member.name.startswith("./") else member.name
+        root, _, rest = name.partition("/")
+        if vpnclient_root is None and "vpnclient" in root.lower() and (rest or member.isdir()):
+            vpnclient_root = root
+        tar.extract(member, extract_dir, **EXTRACT_OPTIONS)
+    return vpnclient_root
+
+
+def _extract_stream(stream: io.BufferedIOBase, extract_dir: Path) -> Optional[str]:
+    """
+    Extract a gzipped tar stream, inflating it with unpigz when available.
+    
+    unpigz decompresses on its own threads while tarfile unpacks the plain
+    tar it produces; without it tarfile inflates the stream itself.
+    
+    Args:
+        stream (io.BufferedIOBase): Gzipped tar data, read sequentially
+        extract_dir (Path): Directory to extract into
+        
+    Returns:
+        Optional[str]: First top-level vpnclient directory seen, if any
+    """
+    unpigz = _which("unpigz")
+    if unpigz is None:
+        # r|gz never seeks, so the stream is consumed as it arrives
+        with tarfile.open(fileobj=stream, mode="r|gz") as tar:
+            return _extract_members(tar, extract_dir)
+    
+    process = subprocess.Popen(
+        [unpigz, "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, **SPAWN_OPTIONS
+    )
+    feed_errors = []
+    
+    def feed() -> None:
+        try:
+            shutil.copyfileobj(stream, process.stdin, DOWNLOAD_BUFFER_SIZE)
+        except BrokenPipeError:
+            # unpigz exited early; its return code reports the failure
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+    
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+            vpnclient_root = _extract_members(tar, extract_dir)
+        # tarfile stops at the end-of-archive marker; drain the padding after
+        # it so unpigz is not killed by SIGPIPE writing to a closed pipe
+        with open(os.devnull, 'wb') as devnull:
+            shutil.copyfileobj(process.stdout, devnull, DOWNLOAD_BUFFER_SIZE)
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        feeder.join()
+        process.wait()
+    
+    if feed_errors:
+        raise feed_errors[0]
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+    return vpnclient_root
+
+
+def _parallel_download(url: str, dest: Path, connections: int = DOWNLOAD_CONNECTIONS) -> None:
+    """
+    Download a file over several connections at once.
+    
+    Uses aria2c when it is installed, otherwise splits the file into HTTP
+    Range requests written into a pre-sized memory map. Servers that do not
+    report a size or support ranges get a single sequential download.
+    
+    Args:
+        url (str): URL to download
+        dest (Path): Destination file
+        connections (int): Number of parallel connections
+    """
+    partial = dest.with_name(dest.name + ".part")
+    
+    aria2c = _which("aria2c")
+    if aria2c is not None:
+        _run(
+            [aria2c, "-q", "-x", str(connections), "-s", str(connections),
+             "-d", str(partial.parent), "-o", partial.name, url],
+            check=True
+        )
+        os.replace(partial, dest)
+        return
+    
+    # Probe with a one-byte range GET; urllib turns redirected HEADs into GETs
+    probe = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    with urllib.request.urlopen(probe) as response:
+        final_url = response.geturl()
+        content_range = response.headers.get("Content-Range", "")
+        ranged = response.status == 206 and "/" in content_range
+        size = int(content_range.rsplit("/", 1)[1]) if ranged and not content_range.endswith("/*") else 0
+    
+    if size <= 0:
+        with urllib.request.urlopen(final_url) as response, open(partial, 'wb') as f:
+            shutil.copyfileobj(response, f, DOWNLOAD_BUFFER_SIZE)
+        os.replace(partial, dest)
+        return
+    
+    step = -(-size // connections)
+    ranges = [(lo, min(lo + step, size) - 1) for lo in range(0, size, step)]
+    
+    with open(partial, 'wb+') as f:
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as mapped:
+            view = memoryview(mapped)
+            
+            def fetch(span: Tuple[int, int]) -> None:
+                lo, hi = span
+                request = urllib.request.Request(final_url, headers={"Range": f"bytes={lo}-{hi}"})
+                with urllib.request.urlopen(request) as response:
+                    if response.status != 206:
+                        raise IOError(f"Server ignored range request for bytes {lo}-{hi}")
+                    offset = lo
+                    while offset <= hi:
+                        read = response.readinto(view[offset:hi + 1])
+                        if not read:
+                            raise IOError(f"Download ended early at byte {offset}")
+                        offset += read
+            
+            try:
+                with ThreadPoolExecutor(max_workers=connections) as executor:
+                    list(executor.map(fetch, ranges))
+                mapped.flush()
+            finally:
+                view.release()
+    
+    os.replace(partial, dest)
+
+
+class _HashingReader(io.RawIOBase):
+    """
+    Raw stream that SHA-256 hashes everything read through it.
+    """
+    
+    def __init__(self, raw: io.BufferedIOBase):
+        """
+        Wrap a stream to hash it as it is read.
+        
+        Args:
+            raw (io.BufferedIOBase): Stream to read from
+        """
+        self._raw = raw
+        self._hash = hashlib.sha256()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        count = self._raw.readinto(buffer)
+        if count:
+            self._hash.update(memoryview(buffer)[:count])
+        return count
+    
+    def hexdigest(self) -> str:
+        """
+        Get the digest of everything read so far.
+        
+        Returns:
+            str: Hex-encoded SHA-256 digest
+        """
+        return self._hash.hexdigest()
+
 
 class SoftEtherInstaller:
     """
@@ -29,17 +348,27 @@ class SoftEtherInstaller:
     client for establishing VPN connections through VPNGate servers.
     """
     
-    def __init__(self, install_dir: str = "/opt/softether"):
+    def __init__(self,
+                 install_dir: str = "/opt/softether",
+                 archive_cache: Optional[str] = None,
+                 prebuilt_url: Optional[str] = None):
         """
         Initialize the SoftEther installer.
         
         Args:
             install_dir (str): Directory where SoftEther will be installed
+            archive_cache (Optional[str]): Path to keep the downloaded archive at;
+                the archive is streamed without touching disk when not set
+            prebuilt_url (Optional[str]): URL template of a prebuilt vpnclient
+                archive with {arch} and {glibc} placeholders, tried before
+                compiling from source
         """
         self.install_dir = Path(install_dir)
+        self.archive_cache = Path(archive_cache) if archive_cache else None
+        self.prebuilt_url = prebuilt_url
         self.download_url = "https://github.com/SoftEtherVPN/SoftEtherVPN_Stable/releases/download/v4.42-9798-beta/softether-vpnclient-v4.42-9798-beta-2023.06.30-linux-x64-64bit.tar.gz"
-        self.archive_name = "softether-vpnclient.tar.gz"
         self.binary_path = self.install_dir / "vpnclient"
+        self.stamp_path = self.install_dir / ".installed"
         
     def check_dependencies(self) -> bool:
         """
@@ -54,7 +383,7 @@ class SoftEtherInstaller:
         missing_packages = []
         
         for package in required_packages:
-            if not shutil.which(package):
+            if not _which(package):
                 missing_packages.append(package)
         
         if missing_packages:
@@ -65,111 +394,229 @@ class SoftEtherInstaller:
         logger.info("All system dependencies are available")
         return True
     
-    def install_dependencies(self) -> bool:
+    def install_dependencies(self, fast_install: bool = False,
+                             keep_apt_cache: bool = False) -> bool:
         """
         Install required system dependencies using apt-get.
         
+        Args:
+            fast_install (bool): Run apt-get under eatmydata so unpacking skips
+                fsync; only safe where a crash mid-install does not matter,
+                such as a Docker build layer
+            keep_apt_cache (bool): Keep the downloaded .deb files in
+                /var/cache/apt/archives for this run only, so a Docker build can
+                reuse them through a cache mount, e.g.
+                RUN --mount=type=cache,target=/var/cache/apt,sharing=locked
+            
         Returns:
             bool: True if installation successful, False otherwise
         """
         logger.info("Installing system dependencies...")
         
         try:
-            # Update package list
-            subprocess.run(["apt-get", "update"], check=True, capture_output=True)
+            # Only install packages whose command is missing
+            packages = [
+                package for package, command in DEPENDENCY_PACKAGES.items()
+                if not _which(command)
+            ]
+            if not packages:
+                logger.info("System dependencies are already installed")
+                return True
+            
+            # Update package list unless it was refreshed recently
+            try:
+                cache_age = time.time() - APT_PKGCACHE.stat().st_mtime
+            except OSError:
+                cache_age = APT_CACHE_TTL
+            if cache_age >= APT_CACHE_TTL:
+                _run(["apt-get", "update", "-o", "Acquire::Languages=none"],
+                     check=True, capture_output=True)
             
-            # Install required packages
-            packages = ["gcc", "make", "wget", "tar", "build-essential"]
-            cmd = ["apt-get", "install", "-y"] + packages
-            subprocess.run(cmd, check=True, capture_output=True)
+            # Install required packages, keeping the downloads only when asked
+            # to, without touching the host's apt configuration
+            cmd = ["apt-get", "install", "-y", "--no-install-recommends"] + packages
+            if keep_apt_cache:
+                cmd[1:1] = ["-o", "Binary::apt::APT::Keep-Downloaded-Packages=true"]
+            if fast_install:
+                if not _which("eatmydata"):
+                    _run(["apt-get", "install", "-y", "--no-install-recommends", "eatmydata"],
+                         check=True, capture_output=True)
+                    _path_executables.cache_clear()
+                cmd = ["eatmydata"] + cmd
+            _run(cmd, check=True, capture_output=True)
+            _path_executables.cache_clear()
             
             logger.info("System dependencies installed successfully")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             logger.error(f"Failed to install dependencies: {e}")
             return False
     
-    def download_softether(self) -> bool:
+    def download_and_extract(self) -> Optional[Path]:
         """
-        Download SoftEther VPN client archive.
+        Download the SoftEther VPN client archive and extract it on the fly.
+        
+        The HTTP response is extracted as it streams in, so extraction
+        overlaps with the download and no archive is written to disk. When an
+        archive cache is configured the archive is downloaded there first.
         
         Returns:
-            bool: True if download successful, False otherwise
+            Optional[Path]: Extracted vpnclient directory, or None on failure
         """
         logger.info(f"Downloading SoftEther VPN client from {self.download_url}")
         
         try:
-            # Create temporary download directory
-            download_path = Path("/tmp") / self.archive_name
+            extract_dir = Path("/tmp/softether")
             
-            # Download the archive
-            urllib.request.urlretrieve(self.download_url, download_path)
+            # Create extraction directory
+            extract_dir.mkdir(exist_ok=True)
             
-            logger.info(f"Downloaded SoftEther archive to {download_path}")
-            return True
+            if self.archive_cache is not None:
+                # Keep a copy of the archive on disk, fetched over parallel connections
+                if not self.archive_cache.exists():
+                    self.archive_cache.parent.mkdir(parents=True, exist_ok=True)
+                    _parallel_download(self.download_url, self.archive_cache)
+                with open(self.archive_cache, 'rb', buffering=DOWNLOAD_BUFFER_SIZE) as stream:
+                    vpnclient_root = _extract_stream(stream, extract_dir)
+            else:
+                # Extract blocks as they arrive
+                with urllib.request.urlopen(self.download_url) as response:
+                    stream = io.BufferedReader(response, buffer_size=DOWNLOAD_BUFFER_SIZE)
+                    vpnclient_root = _extract_stream(stream, extract_dir)
+            
+            logger.info(f"Downloaded and extracted SoftEther archive to {extract_dir}")
+            
+            # The vpnclient directory was noted while extracting
+            if vpnclient_root is None:
+                logger.error("Could not find vpnclient directory in extracted archive")
+                return None
+            
+            return extract_dir / vpnclient_root
             
         except Exception as e:
-            logger.error(f"Failed to download SoftEther: {e}")
-            return False
+            logger.error(f"Failed to download and extract SoftEther: {e}")
+            return None
     
-    def extract_and_compile(self) -> bool:
+    def compile_and_install(self, vpnclient_dir: Path) -> bool:
         """
-        Extract SoftEther archive and compile the VPN client.
+        Compile the extracted SoftEther VPN client and install its binaries.
         
+        Args:
+            vpnclient_dir (Path): Extracted vpnclient source directory
+            
         Returns:
             bool: True if compilation successful, False otherwise
         """
-        logger.info("Extracting and compiling SoftEther VPN client...")
-        
         try:
-            download_path = Path("/tmp") / self.archive_name
-            extract_dir = Path("/tmp/softether")
+            # Compile SoftEther
+            logger.info("Compiling SoftEther VPN client...")
             
-            # Create extraction directory
-            extract_dir.mkdir(exist_ok=True)
+            # Run make on every core; MAKEFLAGS carries -j into recursive makes
+            jobs = f"-j{os.cpu_count() or 2}"
+            _run(["make", jobs], check=True, capture_output=True, cwd=vpnclient_dir,
+                 env={**os.environ, "MAKEFLAGS": jobs})
             
-            # Extract the archive
-            with tarfile.open(download_path, "r:gz") as tar:
-                tar.extractall(extract_dir)
+            self._install_binaries(vpnclient_dir)
             
-            # Find the vpnclient directory
-            vpnclient_dir = None
-            for item in extract_dir.iterdir():
-                if item.is_dir() and "vpnclient" in item.name.lower():
-                    vpnclient_dir = item
-                    break
+            logger.info(f"SoftEther VPN client compiled and installed to {self.install_dir}")
+            return True
             
-            if not vpnclient_dir:
-                logger.error("Could not find vpnclient directory in extracted archive")
-                return False
+        except Exception as e:
+            logger.error(f"Failed to compile SoftEther: {e}")
+            return False
+    
+    def install_prebuilt(self) -> bool:
+        """
+        Install prebuilt SoftEther VPN client binaries, skipping compilation.
+        
+        The archive matching this machine's architecture and glibc version is
+        downloaded from prebuilt_url to a temporary file, and only extracted
+        once it matches the SHA-256 digest published at the same URL with a
+        .sha256 suffix. Extraction requires tarfile's 'data' filter.
+        
+        Returns:
+            bool: True if prebuilt binaries were installed, False to build from source
+        """
+        if not self.prebuilt_url:
+            return False
+        
+        if not EXTRACT_OPTIONS:
+            logger.info("tarfile has no 'data' extraction filter, building SoftEther from source")
+            return False
+        
+        try:
+            glibc = os.confstr("CS_GNU_LIBC_VERSION").split()[-1]
+        except (AttributeError, ValueError, OSError, IndexError):
+            logger.info("Not a glibc system, building SoftEther from source")
+            return False
+        
+        url = self.prebuilt_url.format(arch=platform.machine(), glibc=glibc)
+        logger.info(f"Downloading prebuilt SoftEther VPN client from {url}")
+        
+        try:
+            extract_dir = Path("/tmp/softether-prebuilt")
+            extract_dir.mkdir(exist_ok=True)
             
-            # Compile SoftEther
-            logger.info("Compiling SoftEther VPN client...")
-            os.chdir(vpnclient_dir)
+            # Expected digest, published next to the archive in sha256sum format
+            with urllib.request.urlopen(f"{url}.sha256") as response:
+                expected_digest = response.read().split()[0].decode().lower()
             
-            # Run make
-            subprocess.run(["make"], check=True, capture_output=True)
+            with tempfile.TemporaryFile() as archive:
+                # Hash the archive while it is written to disk
+                with urllib.request.urlopen(url) as response:
+                    reader = _HashingReader(response)
+                    shutil.copyfileobj(reader, archive, DOWNLOAD_BUFFER_SIZE)
+                
+                # Refuse to extract anything that does not match the published digest
+                if reader.hexdigest() != expected_digest:
+                    logger.warning("Prebuilt archive checksum mismatch, building from source")
+                    return False
+                
+                archive.seek(0)
+                vpnclient_root = _extract_stream(archive, extract_dir)
             
-            # Create install directory
-            self.install_dir.mkdir(parents=True, exist_ok=True)
+            vpnclient_dir = extract_dir / vpnclient_root if vpnclient_root else None
+            if vpnclient_dir is None or not (vpnclient_dir / "vpnclient").exists():
+                logger.warning("Prebuilt archive has no vpnclient binary, building from source")
+                return False
             
-            # Copy compiled binaries
-            for binary in ["vpnclient", "vpncmd"]:
-                src = vpnclient_dir / binary
-                dst = self.install_dir / binary
-                if src.exists():
-                    shutil.copy2(src, dst)
-                    # Make executable
-                    os.chmod(dst, 0o755)
+            self._install_binaries(vpnclient_dir)
             
-            logger.info(f"SoftEther VPN client compiled and installed to {self.install_dir}")
+            logger.info(f"Prebuilt SoftEther VPN client installed to {self.install_dir}")
             return True
             
+        except urllib.error.HTTPError as e:
+            logger.info(f"No prebuilt SoftEther VPN client available ({e.code}), building from source")
+            return False
         except Exception as e:
-            logger.error(f"Failed to extract and compile SoftEther: {e}")
+            logger.warning(f"Failed to install prebuilt SoftEther, building from source: {e}")
             return False
     
+    def _install_binaries(self, vpnclient_dir: Path) -> None:
+        """
+        Move the vpnclient and vpncmd binaries into the install directory.
+        
+        Args:
+            vpnclient_dir (Path): Directory holding the binaries
+        """
+        # Create install directory
+        self.install_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Move binaries into place, copying only across filesystems
+        for binary in ["vpnclient", "vpncmd"]:
+            src = vpnclient_dir / binary
+            dst = self.install_dir / binary
+            if src.exists():
+                try:
+                    os.rename(src, dst)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    _copy_file(src, dst)
+                # Make executable
+                os.chmod(dst, 0o755)
+    
     def setup_service(self) -> bool:
         """
         Set up SoftEther VPN client as a service.
@@ -199,9 +646,15 @@ WantedBy=multi-user.target
             service_file = Path("/etc/systemd/system/vpnclient.service")
             service_file.write_text(service_content)
             
-            # Reload systemd and enable service
-            subprocess.run(["systemctl", "daemon-reload"], check=True)
-            subprocess.run(["systemctl", "enable", "vpnclient"], check=True)
+            # Enable the service and reload systemd
+            if Manager is not None:
+                # One D-Bus connection instead of systemctl subprocesses
+                with Manager() as manager:
+                    manager.Manager.EnableUnitFiles([service_file.name.encode()], False, True)
+                    manager.Manager.Reload()
+            else:
+                # systemctl enable reloads the manager configuration itself
+                _run(["systemctl", "enable", "vpnclient"], check=True)
             
             logger.info("SoftEther VPN client service configured")
             return True
@@ -225,10 +678,12 @@ WantedBy=multi-user.target
                 logger.error(f"VPN client binary not found at {self.binary_path}")
                 return False
             
-            # Test vpnclient command
-            result = subprocess.run(
+            # Test vpnclient command; only stderr is reported, so the check's
+            # progress output is not piped back through the interpreter
+            result = _run(
                 [str(self.binary_path), "check"],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=30
             )
@@ -244,32 +699,50 @@ WantedBy=multi-user.target
             logger.error(f"Failed to verify installation: {e}")
             return False
     
-    def install(self) -> bool:
+    def install(self, fast_install: bool = False, keep_apt_cache: bool = False) -> bool:
         """
         Complete installation process for SoftEther VPN client.
         
+        Args:
+            fast_install (bool): Install apt dependencies without fsync
+            keep_apt_cache (bool): Keep downloaded .deb files for a mounted apt cache
+            
         Returns:
             bool: True if installation successful, False otherwise
         """
         logger.info("Starting SoftEther VPN client installation...")
         
-        # Check if already installed
-        if self.binary_path.exists() and self.verify_installation():
-            logger.info("SoftEther VPN client is already installed and working")
-            return True
+        # Check if already installed; the stamp file from a completed install
+        # spares the vpnclient check subprocess on warm starts
+        if (self.binary_path.exists() and
+            os.access(self.binary_path, os.X_OK) and
+            (self.install_dir / "vpncmd").exists()):
+            if self.stamp_path.exists():
+                logger.info("SoftEther VPN client is already installed")
+                return True
+            if self.verify_installation():
+                self.stamp_path.touch()
+                logger.info("SoftEther VPN client is already installed and working")
+                return True
         
-        # Install dependencies
-        if not self.check_dependencies():
-            if not self.install_dependencies():
-                return False
+        # Drop any stamp from an earlier install until this one is verified
+        self.stamp_path.unlink(missing_ok=True)
         
-        # Download SoftEther
-        if not self.download_softether():
-            return False
-        
-        # Extract and compile
-        if not self.extract_and_compile():
-            return False
+        # Build from source unless prebuilt binaries could be installed
+        if not self.install_prebuilt():
+            # Install dependencies
+            if not self.check_dependencies():
+                if not self.install_dependencies(fast_install, keep_apt_cache):
+                    return False
+            
+            # Download and extract SoftEther
+            vpnclient_dir = self.download_and_extract()
+            if vpnclient_dir is None:
+                return False
+            
+            # Compile and install
+            if not self.compile_and_install(vpnclient_dir):
+                return False
         
         # Setup service
         if not self.setup_service():
@@ -279,23 +752,47 @@ WantedBy=multi-user.target
         if not self.verify_installation():
             return False
         
+        # Mark the installation as verified
+        self.stamp_path.touch()
+        
         logger.info("SoftEther VPN client installation completed successfully")
         return True
 
 
-def install_softether(install_dir: str = "/opt/softether") -> Tuple[bool, Optional[str]]:
+def install_softether(install_dir: str = "/opt/softether",
+                      archive_cache: Optional[str] = None,
+                      prebuilt_url: Optional[str] = None,
+                      fast_install: Optional[bool] = None,
+                      keep_apt_cache: Optional[bool] = None) -> Tuple[bool, Optional[str]]:
     """
     Main function to install SoftEther VPN client.
     
+    Options left unset are read from the SOFTETHER_ARCHIVE_CACHE,
+    SOFTETHER_PREBUILT_URL, SOFTETHER_FAST_INSTALL and SOFTETHER_KEEP_APT_CACHE
+    environment variables; the flags are enabled by the value "true".
+    
     Args:
         install_dir (str): Directory where SoftEther will be installed
+        archive_cache (Optional[str]): Path to keep the downloaded source archive at
+        prebuilt_url (Optional[str]): URL template of a prebuilt vpnclient archive
+        fast_install (Optional[bool]): Install apt dependencies without fsync
+        keep_apt_cache (Optional[bool]): Keep downloaded .deb files for a mounted apt cache
         
     Returns:
         Tuple[bool, Optional[str]]: (success_status, error_message)
     """
+    if archive_cache is None:
+        archive_cache = os.environ.get("SOFTETHER_ARCHIVE_CACHE") or None
+    if prebuilt_url is None:
+        prebuilt_url = os.environ.get("SOFTETHER_PREBUILT_URL") or None
+    if fast_install is None:
+        fast_install = os.environ.get("SOFTETHER_FAST_INSTALL", "").lower() == "true"
+    if keep_apt_cache is None:
+        keep_apt_cache = os.environ.get("SOFTETHER_KEEP_APT_CACHE", "").lower() == "true"
+    
     try:
-        installer = SoftEtherInstaller(install_dir)
-        success = installer.install()
+        installer = SoftEtherInstaller(install_dir, archive_cache, prebuilt_url)
+        success = installer.install(fast_install, keep_apt_cache)
         
         if success:
             return True, None
@@ -312,6 +809,8 @@ if __name__ == "__main__":
     """
     Direct execution for testing the installer.
     """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     success, error = install_softether()
     if success:
         print("SoftEther VPN client installed successfully!")
@@ -0,0 +1,112 @@
+"""
+Tests for the prebuilt install path of network/install_softether.py.
+"""
+
+import functools
+import hashlib
+import importlib
+import io
+import os
+import platform
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+# network/__init__.py re-exports install_softether, shadowing the submodule
+install_module = importlib.import_module("network.install_softether")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _build_prebuilt_archive(path: Path) -> None:
+    """
+    Write a gzipped tar with stub vpnclient and vpncmd binaries.
+
+    Args:
+        path (Path): Archive to create
+    """
+    with tarfile.open(path, "w:gz") as tar:
+        for name in ("vpnclient", "vpncmd"):
+            data = b"#!/bin/sh\nexit 0\n"
+            info = tarfile.TarInfo(f"vpnclient/{name}")
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+
+
+@unittest.skipUnless(install_module.EXTRACT_OPTIONS, "tarfile has no 'data' filter")
+class InstallPrebuiltTest(unittest.TestCase):
+
+    def setUp(self):
+        self.serve_dir = Path(tempfile.mkdtemp())
+        self.install_dir = Path(tempfile.mkdtemp()) / "softether"
+        self.addCleanup(shutil.rmtree, self.serve_dir)
+        self.addCleanup(shutil.rmtree, self.install_dir.parent)
+
+        glibc = os.confstr("CS_GNU_LIBC_VERSION").split()[-1]
+        archive = self.serve_dir / f"vpnclient-{platform.machine()}-{glibc}.tar.gz"
+        _build_prebuilt_archive(archive)
+        self.digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+        self.sidecar = archive.with_name(archive.name + ".sha256")
+        self.sidecar.write_text(f"{self.digest}  {archive.name}\n")
+
+        handler = functools.partial(_QuietHandler, directory=str(self.serve_dir))
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.prebuilt_url = (f"http://127.0.0.1:{self.server.server_address[1]}"
+                             "/vpnclient-{arch}-{glibc}.tar.gz")
+
+        # Keep the test away from systemd and the source build
+        for name, result in (("setup_service", True), ("verify_installation", True),
+                             ("download_and_extract", None)):
+            patcher = mock.patch.object(install_module.SoftEtherInstaller, name,
+                                        return_value=result)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_installs_prebuilt_binaries(self):
+        success, error = install_module.install_softether(
+            str(self.install_dir), prebuilt_url=self.prebuilt_url
+        )
+
+        self.assertTrue(success, error)
+        self.download_and_extract.assert_not_called()
+        for name in ("vpnclient", "vpncmd"):
+            self.assertTrue(os.access(self.install_dir / name, os.X_OK))
+        self.assertTrue((self.install_dir / ".installed").exists())
+
+    def test_prebuilt_url_read_from_environment(self):
+        with mock.patch.dict(os.environ, {"SOFTETHER_PREBUILT_URL": self.prebuilt_url}):
+            success, error = install_module.install_softether(str(self.install_dir))
+
+        self.assertTrue(success, error)
+        self.download_and_extract.assert_not_called()
+
+    def test_checksum_mismatch_falls_back_to_source(self):
+        self.sidecar.write_text("0" * 64 + "\n")
+
+        with mock.patch.object(install_module.SoftEtherInstaller, "check_dependencies",
+                               return_value=True):
+            success, _ = install_module.install_softether(
+                str(self.install_dir), prebuilt_url=self.prebuilt_url
+            )
+
+        self.assertFalse(success)
+        self.download_and_extract.assert_called_once()
+        self.assertFalse((self.install_dir / "vpnclient").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()